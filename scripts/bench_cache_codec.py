@@ -0,0 +1,88 @@
+"""Benchmarks cache file encodings on bundles of message-like contents.
+
+For each contents size and codec setting, reports the size of the 
+bundle file, and the time to write, read, and read the manifest of a 
+bundle with the file backend.
+
+    python scripts/bench_cache_codec.py [--sizes 1000 100000 10000000]
+"""
+
+import argparse
+import os
+import random
+import string
+import tempfile
+import time
+from pathlib import Path
+
+from rid_lib.ext import Bundle
+from rid_lib.types import SlackMessage
+
+from koi_net.components.cache_backends import BundleCodec, FileCacheBackend
+from koi_net.components.cache_backends.codec import msgpack
+from koi_net.config import CacheCompression, CacheEncoding
+
+CODECS = {
+    "indent=2": BundleCodec(CacheEncoding.JSON),
+    "compact": BundleCodec(CacheEncoding.COMPACT_JSON),
+    "compact+zlib": BundleCodec(CacheEncoding.COMPACT_JSON, CacheCompression.ZLIB, 0),
+    "compact+lzma": BundleCodec(CacheEncoding.COMPACT_JSON, CacheCompression.LZMA, 0),
+}
+if msgpack is not None:
+    CODECS["msgpack"] = BundleCodec(CacheEncoding.MSGPACK)
+    CODECS["msgpack+zlib"] = BundleCodec(CacheEncoding.MSGPACK, CacheCompression.ZLIB, 0)
+
+
+def generate_contents(size: int, rng: random.Random) -> dict:
+    """Returns Slack-like message contents of roughly `size` bytes."""
+    words = [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9)))
+        for _ in range(2000)
+    ]
+    messages = []
+    for _ in range(max(1, size // 200)):
+        messages.append({
+            "user": rng.choice(words),
+            "ts": f"{rng.random() * 1e9:.6f}",
+            "text": " ".join(rng.choices(words, k=20)),
+            "reactions": rng.randint(0, 9)
+        })
+    return {"messages": messages}
+
+
+def time_per_op(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 10_000_000])
+    args = parser.parse_args()
+    
+    rng = random.Random(0)
+    rid = SlackMessage("T1", "C1", "1.2")
+    
+    for size in args.sizes:
+        bundle = Bundle.generate(rid, generate_contents(size, rng))
+        repeat = max(2, min(500, 5_000_000 // size))
+        
+        for name, codec in CODECS.items():
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                backend = FileCacheBackend(Path(tmp_dir), codec=codec)
+                write = time_per_op(lambda: backend.write(bundle), repeat)
+                read = time_per_op(lambda: backend.read(rid), repeat)
+                read_manifest = time_per_op(lambda: backend.read_manifest(rid), repeat)
+                file_size = os.path.getsize(backend.file_path_to(rid))
+            
+            print(
+                f"{size:>10} {name:14} file={file_size:>10}B "
+                f"write={write * 1e3:9.3f}ms read={read * 1e3:9.3f}ms "
+                f"manifest={read_manifest * 1e3:8.3f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
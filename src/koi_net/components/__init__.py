@@ -1,4 +1,5 @@
 from .cache import Cache
+from .cache_evictor import CacheEvictor
 from .effector import Effector
 from .event_worker import EventProcessingWorker
 from .kobj_worker import KnowledgeProcessingWorker
@@ -9,6 +10,7 @@ from .server import NodeServer
 from .secure_manager import SecureManager
 from .kobj_queue import KobjQueue
 from .pipeline import KnowledgePipeline
+from .pipeline_metrics import PipelineMetrics
 from .error_handler import ErrorHandler
 from .event_buffer import EventBuffer
 from .event_queue import EventQueue
@@ -1,95 +1,449 @@
-import os
-import shutil
+import copy
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from enum import StrEnum
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from logging import Logger
+from typing import Callable, Iterator
 
-from pydantic import ValidationError
 from rid_lib.core import RID, RIDType
-from rid_lib.ext import Bundle
-from rid_lib.ext.utils import b64_encode, b64_decode
+from rid_lib.ext import Bundle, Manifest
 
 from koi_net.config.base import BaseNodeConfig
+from koi_net.config.koi_net_config import CacheBackendType
+from koi_net.infra import depends_on
+from .interfaces import CacheBackend
+from .cache_backends import BundleCodec, FileCacheBackend, SqliteCacheBackend
+from .cache_limiter import CacheLimiter
+
+
+class CacheOp(StrEnum):
+    WRITE = "WRITE"
+    DELETE = "DELETE"
+    DROP = "DROP"
+
+type CacheListener = Callable[[CacheOp, RID | None, Manifest | None], None]
+
+# backend metadata key of the cache generation token
+GENERATION_KEY = "generation"
 
 
+@dataclass
+class BundleLRU:
+    """Bounded, thread safe LRU of validated bundles.
+    
+    Bundles returned from the LRU are shared between callers, and MUST
+    NOT be mutated.
+    """
+    
+    max_size: int
+    
+    hits: int = field(init=False, default=0)
+    misses: int = field(init=False, default=0)
+    # incremented on every invalidation, used to discard stale reads
+    version: int = field(init=False, default=0)
+    
+    _bundles: OrderedDict[RID, Bundle] = field(init=False, default_factory=OrderedDict)
+    _lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+    
+    def __len__(self) -> int:
+        return len(self._bundles)
+    
+    def get(self, rid: RID) -> Bundle | None:
+        """Returns bundle and marks it as recently used, or `None` on miss."""
+        with self._lock:
+            bundle = self._bundles.get(rid)
+            if bundle is None:
+                self.misses += 1
+                return None
+            
+            self.hits += 1
+            self._bundles.move_to_end(rid)
+            return bundle
+    
+    def peek(self, rid: RID) -> Bundle | None:
+        """Returns bundle without affecting LRU order or counters."""
+        with self._lock:
+            return self._bundles.get(rid)
+    
+    def put(self, bundle: Bundle, version: int):
+        """Adds bundle read at `version`, evicting the least recently used.
+        
+        Ignored if the LRU was invalidated since `version`, since the 
+        bundle may be stale.
+        """
+        if self.max_size <= 0:
+            return
+        
+        with self._lock:
+            if version != self.version:
+                return
+            
+            self._bundles[bundle.rid] = bundle
+            self._bundles.move_to_end(bundle.rid)
+            while len(self._bundles) > self.max_size:
+                self._bundles.popitem(last=False)
+    
+    def invalidate(self, rid: RID):
+        with self._lock:
+            self.version += 1
+            self._bundles.pop(rid, None)
+    
+    def clear(self):
+        with self._lock:
+            self.version += 1
+            self._bundles.clear()
+    
+    def stats(self) -> dict[str, int]:
+        """Returns hit, miss, and size counters."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._bundles),
+            "max_size": self.max_size
+        }
+
 @dataclass
 class Cache:
+    """Local RID cache, delegates storage to the configured backend.
+    
+    Publishes a change feed of `(op, rid, manifest)` to subscribed 
+    listeners after every write and delete. Listeners are called on 
+    the writing thread, and should return quickly.
+    
+    The cache generation is a token persisted with the cache, which
+    is replaced before the first change after it is observed. State 
+    derived from the cache can be saved with the observed generation, 
+    and is still current if the generation matches when loaded.
+    """
+    
+    log: Logger
     config: BaseNodeConfig
     root_dir: Path
     
+    backend: CacheBackend = field(init=False)
+    lru: BundleLRU = field(init=False)
+    limiter: CacheLimiter = field(init=False)
+    listeners: tuple[CacheListener, ...] = field(init=False, default=())
+    _listeners_lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+    generation: str | None = field(init=False, default=None)
+    # the generation may have been observed by a previous run
+    _generation_observed: bool = field(init=False, default=True)
+    _generation_lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+    
+    def __post_init__(self):
+        self.backend = self.create_backend()
+        self.lru = BundleLRU(self.config.koi_net.cache.lru_size)
+        self.limiter = CacheLimiter(
+            limits=self.config.koi_net.cache.limits,
+            eviction_timeout=self.config.koi_net.cache.eviction_timeout
+        )
+    
     @property
-    def directory_path(self):
+    def directory_path(self) -> Path:
         return self.root_dir / self.config.koi_net.cache_directory_path
+    
+    @property
+    def sqlite_path(self) -> Path:
+        return self.root_dir / self.config.koi_net.cache.sqlite_path
+    
+    def create_file_backend(self) -> FileCacheBackend:
+        """Returns file backend for the cache directory, as set in config."""
+        cache_config = self.config.koi_net.cache
+        return FileCacheBackend(
+            directory_path=self.directory_path,
+            fsync_policy=cache_config.fsync_policy,
+            group_commit_interval=cache_config.group_commit_interval,
+            codec=BundleCodec(
+                encoding=cache_config.encoding,
+                compression=cache_config.compression,
+                compression_threshold=cache_config.compression_threshold
+            ),
+            layout=cache_config.layout,
+            shard_depth=cache_config.shard_depth
+        )
+    
+    def create_backend(self) -> CacheBackend:
+        """Returns backend set in config."""
+        cache_config = self.config.koi_net.cache
+        match cache_config.backend:
+            case CacheBackendType.FILE:
+                return self.create_file_backend()
+            case CacheBackendType.SQLITE:
+                return SqliteCacheBackend(
+                    db_path=self.sqlite_path,
+                    fsync_policy=cache_config.fsync_policy,
+                    group_commit_interval=cache_config.group_commit_interval
+                )
+    
+    def file_path_to(self, rid: RID) -> Path:
+        """Returns path to the file storing an RID's bundle in the cache directory."""
+        if isinstance(self.backend, FileCacheBackend):
+            return self.backend.file_path_to(rid)
+        return self.create_file_backend().file_path_to(rid)
+    
+    def start(self):
+        self.backend.open()
+        if isinstance(self.backend, FileCacheBackend):
+            self.backend.migrate_layout()
+        else:
+            self.migrate_from_directory()
+        self.generation = self.backend.read_meta(GENERATION_KEY)
+        self.load_usage()
+    
+    @depends_on("kobj_worker", "event_worker", "cache_evictor", "graph")
+    def stop(self):
+        self.backend.close()
+    
+    def migrate_from_directory(self):
+        """Migrates bundles from the cache directory to the configured backend.
         
-    def file_path_to(self, rid: RID) -> str:
-        encoded_rid_str = b64_encode(str(rid))
-        return self.directory_path / (encoded_rid_str + ".json")
-
+        Only runs when the backend is empty. The cache directory is 
+        renamed with a `.migrated` suffix afterwards, so the migration
+        happens once.
+        """
+        
+        if not self.directory_path.is_dir():
+            return
+        
+        if self.backend.count() > 0:
+            self.log.warning(f"Cache directory '{self.directory_path}' not migrated, {self.config.koi_net.cache.backend} backend is not empty")
+            return
+        
+        self.log.info(f"Migrating cache directory '{self.directory_path}' to {self.config.koi_net.cache.backend} backend...")
+        num_migrated = self.backend.import_from(
+            FileCacheBackend.from_directory(self.directory_path))
+        self.directory_path.rename(
+            self.directory_path.with_name(self.directory_path.name + ".migrated"))
+        self.log.info(f"Migrated {num_migrated} bundle(s)")
+    
+    def load_usage(self):
+        """Loads sizes of cached bundles with limited RID types.
+        
+        Bundles are recorded as written at their manifest timestamp, in 
+        that order, so TTLs carry over restarts.
+        """
+        if not self.limiter.rid_types:
+            return
+        
+        rids = list(self.backend.iter_rids(self.limiter.rid_types))
+        sizes = self.backend.read_sizes(rids)
+        now = time.time()
+        written_at = {
+            rid: min(manifest.timestamp.timestamp(), now)
+            for rid, manifest in self.backend.read_manifests(rids).items()
+        }
+        for rid in sorted(sizes, key=lambda rid: written_at.get(rid, now)):
+            self.limiter.record_write(rid, sizes[rid], written_at.get(rid))
+        self.log.info(f"Loaded usage of {len(rids)} bundle(s) with cache limits")
+    
+    def record_writes(self, rids: list[RID]):
+        """Records sizes of written bundles with limited RID types."""
+        tracked_rids = [rid for rid in rids if self.limiter.tracks(rid)]
+        if not tracked_rids:
+            return
+        
+        for rid, size in self.backend.read_sizes(tracked_rids).items():
+            self.limiter.record_write(rid, size)
+    
+    def observe_generation(self) -> str:
+        """Returns current cache generation.
+        
+        The generation is replaced before the next change, so it should
+        be observed while the cache isn't being changed, or state saved
+        with it may be missing that change.
+        """
+        with self._generation_lock:
+            if self.generation is None:
+                self.rotate_generation()
+            self._generation_observed = True
+            return self.generation
+    
+    def rotate_generation(self):
+        """Replaces cache generation with a new token."""
+        self.generation = uuid.uuid4().hex
+        self.backend.write_meta(GENERATION_KEY, self.generation)
+    
+    def before_change(self):
+        """Rotates cache generation before a change, if it was observed."""
+        if not self._generation_observed:
+            return
+        
+        with self._generation_lock:
+            if self._generation_observed:
+                self.rotate_generation()
+                self._generation_observed = False
+    
+    def subscribe(self, listener: CacheListener):
+        """Subscribes listener to the change feed.
+        
+        Listeners are called with `(WRITE, rid, manifest)` after a 
+        bundle is written, `(DELETE, rid, manifest)` after a cached 
+        bundle is deleted, with its last manifest, and 
+        `(DROP, None, None)` after the cache is dropped.
+        """
+        with self._listeners_lock:
+            self.listeners = (*self.listeners, listener)
+    
+    def unsubscribe(self, listener: CacheListener):
+        """Unsubscribes listener from the change feed."""
+        with self._listeners_lock:
+            self.listeners = tuple(
+                other for other in self.listeners if other != listener)
+    
+    def publish(self, op: CacheOp, rid: RID | None, manifest: Manifest | None):
+        """Calls all listeners with a change, logging their errors."""
+        for listener in self.listeners:
+            try:
+                listener(op, rid, manifest)
+            except Exception as exc:
+                self.log.error(f"Cache listener {listener!r} failed on {op} {rid!r}: {exc}")
+    
     def write(self, bundle: Bundle) -> Bundle:
         """Writes bundle to cache, returns a Bundle."""
-        if not os.path.exists(self.directory_path):
-            os.makedirs(self.directory_path)
-            
-        with open(
-            file=self.file_path_to(bundle.manifest.rid), 
-            mode="w", 
-            encoding="utf-8"
-        ) as f:
-            f.write(bundle.model_dump_json(indent=2))
-
+        self.before_change()
+        self.backend.write(bundle)
+        self.lru.invalidate(bundle.rid)
+        self.record_writes([bundle.rid])
+        self.publish(CacheOp.WRITE, bundle.rid, bundle.manifest)
         return bundle
     
+    def write_many(self, bundles: list[Bundle]) -> list[Bundle]:
+        """Writes bundles to cache in bulk, returns the bundles."""
+        if not bundles:
+            return bundles
+        
+        self.before_change()
+        self.backend.write_many(bundles)
+        for bundle in bundles:
+            self.lru.invalidate(bundle.rid)
+        self.record_writes([bundle.rid for bundle in bundles])
+        for bundle in bundles:
+            self.publish(CacheOp.WRITE, bundle.rid, bundle.manifest)
+        return bundles
+    
     def exists(self, rid: RID) -> bool:
-        return os.path.exists(
-            self.file_path_to(rid)
-        )
-
-    def read(self, rid: RID) -> Bundle | None:
-        """Reads and returns CacheEntry from RID cache."""
-        try:
-            with open(
-                file=self.file_path_to(rid), 
-                mode="r",
-                encoding="utf-8"
-            ) as f:
-                file_content = f.read()
-            
-            if file_content == "":
-                return None
-
-            try:
-                return Bundle.model_validate_json(file_content)
-            except ValidationError:
+        return self.backend.exists(rid)
+    
+    @staticmethod
+    def copy_bundle(bundle: Bundle) -> Bundle:
+        """Returns bundle with a copy of its contents."""
+        return bundle.model_copy(update={"contents": copy.deepcopy(bundle.contents)})
+    
+    def read(self, rid: RID, copy: bool = False) -> Bundle | None:
+        """Reads and returns bundle from RID cache.
+        
+        Bundles are served from the LRU when possible, and are shared 
+        with it, so they MUST NOT be mutated. With `copy=True`, their 
+        contents are copied, so callers may mutate them.
+        """
+        self.limiter.record_read(rid)
+        bundle = self.lru.get(rid)
+        if bundle is None:
+            version = self.lru.version
+            bundle = self.backend.read(rid)
+            if bundle is None:
                 return None
-            
-        except FileNotFoundError:
-            return None
+            self.lru.put(bundle, version)
+        
+        return self.copy_bundle(bundle) if copy else bundle
+    
+    def read_many(self, rids: list[RID], copy: bool = False) -> dict[RID, Bundle]:
+        """Reads bundles from RID cache in bulk.
+        
+        Returns a dict of the bundles found, in request order. Bundles 
+        are served from the LRU when possible, and MUST NOT be mutated, 
+        unless their contents are copied with `copy=True`.
+        """
+        for rid in rids:
+            self.limiter.record_read(rid)
+        
+        bundles: dict[RID, Bundle | None] = {
+            rid: self.lru.get(rid) for rid in rids}
+        
+        missed_rids = [rid for rid, bundle in bundles.items() if bundle is None]
+        if missed_rids:
+            version = self.lru.version
+            read_bundles = self.backend.read_many(missed_rids)
+            for rid, bundle in read_bundles.items():
+                bundles[rid] = bundle
+                self.lru.put(bundle, version)
+        
+        return {
+            rid: self.copy_bundle(bundle) if copy else bundle
+            for rid, bundle in bundles.items() 
+            if bundle is not None
+        }
+    
+    def read_manifest(self, rid: RID) -> Manifest | None:
+        """Reads and returns manifest from RID cache, without loading contents."""
+        bundle = self.lru.peek(rid)
+        if bundle is not None:
+            return bundle.manifest
+        return self.backend.read_manifest(rid)
+    
+    def read_manifests(self, rids: list[RID]) -> dict[RID, Manifest]:
+        """Reads manifests from RID cache in bulk, without loading contents.
+        
+        Returns a dict of the manifests found, in request order.
+        """
+        manifests: dict[RID, Manifest | None] = {}
+        for rid in rids:
+            bundle = self.lru.peek(rid)
+            manifests[rid] = bundle.manifest if bundle else None
+        
+        missed_rids = [rid for rid, manifest in manifests.items() if manifest is None]
+        if missed_rids:
+            manifests.update(self.backend.read_manifests(missed_rids))
+        
+        return {
+            rid: manifest 
+            for rid, manifest in manifests.items() 
+            if manifest is not None
+        }
     
     def list_rids(self, rid_types: list[RIDType] | None = None) -> list[RID]:
-        if not os.path.exists(self.directory_path):
-            return []
-        
-        rids = []
-        for filename in os.listdir(self.directory_path):
-            encoded_rid_str = filename.split(".")[0]
-            rid_str = b64_decode(encoded_rid_str)
-            rid = RID.from_string(rid_str)
-            
-            if not rid_types or type(rid) in rid_types:
-                rids.append(rid)
-            
-        return rids
-                
+        return self.backend.list_rids(rid_types)
+    
+    def iter_rids(self, rid_types: list[RIDType] | None = None) -> Iterator[RID]:
+        """Yields RIDs in cache, without listing them all at once if possible."""
+        return self.backend.iter_rids(rid_types)
+    
     def delete(self, rid: RID) -> None:
         """Deletes cache bundle."""
-        try:
-            os.remove(self.file_path_to(rid))
-        except FileNotFoundError:
+        manifest = self.read_manifest(rid) if self.listeners else None
+        self.before_change()
+        self.backend.delete(rid)
+        self.lru.invalidate(rid)
+        self.limiter.record_delete(rid)
+        if manifest is not None:
+            self.publish(CacheOp.DELETE, rid, manifest)
+    
+    def delete_many(self, rids: list[RID]) -> None:
+        """Deletes cache bundles in bulk."""
+        if not rids:
             return
-
+        
+        manifests = self.read_manifests(rids) if self.listeners else {}
+        self.before_change()
+        self.backend.delete_many(rids)
+        for rid in rids:
+            self.lru.invalidate(rid)
+            self.limiter.record_delete(rid)
+        
+        for rid, manifest in manifests.items():
+            self.publish(CacheOp.DELETE, rid, manifest)
+    
     def drop(self) -> None:
         """Deletes all cache bundles."""
-        try:
-            shutil.rmtree(self.directory_path)
-        except FileNotFoundError:
-            return
-
+        self.before_change()
+        self.backend.drop()
+        # dropping may delete the backend's metadata
+        with self._generation_lock:
+            self.backend.write_meta(GENERATION_KEY, self.generation)
+        self.lru.clear()
+        self.limiter.clear()
+        self.publish(CacheOp.DROP, None, None)
@@ -0,0 +1,3 @@
+from .codec import BundleCodec
+from .file_backend import FileCacheBackend
+from .sqlite_backend import SqliteCacheBackend
\ No newline at end of file
@@ -0,0 +1,198 @@
+import re
+import json
+import lzma
+import zlib
+import codecs
+from dataclasses import dataclass
+from typing import BinaryIO
+
+import structlog
+from rid_lib.ext import Bundle, Manifest
+
+from koi_net.config.koi_net_config import CacheCompression, CacheEncoding
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+log = structlog.stdlib.get_logger()
+
+# JSON can't start with a null byte, so headerless files are always JSON
+MAGIC = b"\x00KOI"
+HEADER_SIZE = len(MAGIC) + 2
+
+ENCODING_IDS: dict[CacheEncoding, bytes] = {
+    CacheEncoding.JSON: b"J",
+    CacheEncoding.COMPACT_JSON: b"J",
+    CacheEncoding.MSGPACK: b"M"
+}
+
+COMPRESSION_IDS: dict[CacheCompression, bytes] = {
+    CacheCompression.NONE: b"N",
+    CacheCompression.ZLIB: b"Z",
+    CacheCompression.LZMA: b"X"
+}
+
+# bundles are serialized with the manifest as the first field
+MANIFEST_PREFIX = re.compile(r'\s*\{\s*"manifest"\s*:\s*')
+MANIFEST_READ_SIZE = 4096
+
+
+@dataclass
+class BundleCodec:
+    """Encodes and decodes bundles stored in cache files.
+    
+    Uncompressed JSON is stored as is, so existing cache files remain
+    readable. All other formats start with a header identifying the
+    encoding and compression used, which is detected on decode. Bundles
+    are only compressed when their encoded size is at least
+    `compression_threshold` bytes.
+    """
+    
+    encoding: CacheEncoding = CacheEncoding.COMPACT_JSON
+    compression: CacheCompression = CacheCompression.NONE
+    compression_threshold: int = 64 * 1024
+    
+    def __post_init__(self):
+        if self.encoding == CacheEncoding.MSGPACK and msgpack is None:
+            log.warning("msgpack is not installed, falling back to compact JSON encoding")
+            self.encoding = CacheEncoding.COMPACT_JSON
+    
+    def encode(self, bundle: Bundle) -> bytes:
+        match self.encoding:
+            case CacheEncoding.JSON:
+                data = bundle.model_dump_json(indent=2).encode()
+            case CacheEncoding.COMPACT_JSON:
+                data = bundle.model_dump_json().encode()
+            case CacheEncoding.MSGPACK:
+                data = msgpack.packb(bundle.model_dump(mode="json"))
+        
+        compression = self.compression
+        if len(data) < self.compression_threshold:
+            compression = CacheCompression.NONE
+        
+        if (
+            compression == CacheCompression.NONE and
+            self.encoding != CacheEncoding.MSGPACK
+        ):
+            return data
+        
+        match compression:
+            case CacheCompression.ZLIB:
+                data = zlib.compress(data)
+            case CacheCompression.LZMA:
+                data = lzma.compress(data)
+        
+        return (
+            MAGIC +
+            ENCODING_IDS[self.encoding] +
+            COMPRESSION_IDS[compression] +
+            data
+        )
+    
+    @staticmethod
+    def parse_header(data: bytes) -> tuple[bytes, bytes]:
+        """Returns encoding and compression IDs from header."""
+        if len(data) < HEADER_SIZE:
+            raise ValueError("Truncated cache file header")
+        return data[len(MAGIC):len(MAGIC)+1], data[len(MAGIC)+1:HEADER_SIZE]
+    
+    def decode(self, data: bytes) -> Bundle:
+        """Decodes bundle in any supported format.
+        
+        Raises `ValueError` if the data is invalid, or stored in a format
+        which can't be read.
+        """
+        if not data.startswith(MAGIC):
+            return Bundle.model_validate_json(data)
+        
+        encoding_id, compression_id = self.parse_header(data)
+        data = data[HEADER_SIZE:]
+        
+        try:
+            match compression_id:
+                case b"N":
+                    pass
+                case b"Z":
+                    data = zlib.decompress(data)
+                case b"X":
+                    data = lzma.decompress(data)
+                case _:
+                    raise ValueError(f"Unknown compression {compression_id!r}")
+        except (zlib.error, lzma.LZMAError) as exc:
+            raise ValueError(f"Failed to decompress cache file: {exc}") from exc
+        
+        match encoding_id:
+            case b"J":
+                return Bundle.model_validate_json(data)
+            case b"M":
+                return Bundle.model_validate(self._unpack(data))
+            case _:
+                raise ValueError(f"Unknown encoding {encoding_id!r}")
+    
+    @staticmethod
+    def _unpack(data: bytes) -> dict:
+        if msgpack is None:
+            raise ValueError("msgpack is required to read msgpack encoded cache files")
+        try:
+            return msgpack.unpackb(data)
+        except Exception as exc:
+            raise ValueError(f"Failed to unpack cache file: {exc}") from exc
+    
+    def read_manifest(self, f: BinaryIO) -> Manifest:
+        """Reads manifest from file, without decoding contents if possible.
+        
+        Uncompressed JSON and msgpack files are parsed from the start of
+        the file, up to the end of the manifest. Compressed files are
+        decoded in full. Raises `ValueError` if the file is invalid.
+        """
+        head = f.read(MANIFEST_READ_SIZE)
+        
+        if not head.startswith(MAGIC):
+            manifest_data = self._read_json_manifest(f, head)
+        
+        elif self.parse_header(head) == (b"M", b"N") and msgpack is not None:
+            f.seek(HEADER_SIZE)
+            manifest_data = self._read_msgpack_manifest(f)
+        
+        else:
+            manifest_data = None
+        
+        if manifest_data is None:
+            f.seek(0)
+            return self.decode(f.read()).manifest
+        
+        return Manifest.model_validate(manifest_data)
+    
+    @staticmethod
+    def _read_json_manifest(f: BinaryIO, head: bytes) -> dict | None:
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        file_content = decoder.decode(head)
+        prefix = MANIFEST_PREFIX.match(file_content)
+        if not prefix:
+            return None
+        
+        json_decoder = json.JSONDecoder()
+        while True:
+            try:
+                manifest_data, _ = json_decoder.raw_decode(
+                    file_content, prefix.end())
+                return manifest_data
+            except json.JSONDecodeError:
+                # manifest extends past the bytes read so far
+                chunk = f.read(len(file_content))
+                if not chunk:
+                    raise ValueError("Truncated cache file")
+                file_content += decoder.decode(chunk)
+    
+    @staticmethod
+    def _read_msgpack_manifest(f: BinaryIO) -> dict | None:
+        unpacker = msgpack.Unpacker(f, read_size=MANIFEST_READ_SIZE)
+        try:
+            unpacker.read_map_header()
+            if unpacker.unpack() != "manifest":
+                return None
+            return unpacker.unpack()
+        except Exception as exc:
+            raise ValueError(f"Failed to unpack cache file: {exc}") from exc
@@ -0,0 +1,507 @@
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import BinaryIO, Iterator
+
+import structlog
+from rid_lib.core import RID, RIDType
+from rid_lib.ext import Bundle, Manifest
+from rid_lib.ext.utils import b64_encode, b64_decode, sha256_hash
+
+from koi_net.config.koi_net_config import CacheLayout, FsyncPolicy
+from ..interfaces import CacheBackend
+from .group_commit import GroupCommitter
+from .codec import BundleCodec
+
+log = structlog.stdlib.get_logger()
+
+# records the layout of the cache directory, absent for flat layouts
+LAYOUT_MARKER = ".layout"
+
+
+@dataclass
+class FileCacheBackend(CacheBackend):
+    """Stores each bundle as a file in the cache directory.
+    
+    Bundles are encoded by the codec, which reads files in any format
+    it supports, so files written with different settings can coexist.
+    Files keep the `.json` suffix in every format, since the format is
+    detected from the file itself: each RID has a single path, and 
+    changing settings doesn't rename or rewrite existing files.
+    
+    With the `SHARDED` layout, files are stored `shard_depth` levels of
+    subdirectories deep, named by successive pairs of hex digits of the
+    RID's SHA-256 hash, instead of all in the cache directory. 
+    
+    Bundles are written to a temporary file, then renamed over the 
+    previous version, so a crash never leaves a partially written file.
+    With the `PER_WRITE` fsync policy, files are synced before rename 
+    and their directory after. With `GROUP_COMMIT`, temporary files 
+    written since the last commit are synced together on a background 
+    thread, then renamed, then their directories are synced once. Until 
+    then, reads are served from the temporary files.
+    
+    Manifests are read by parsing only the beginning of the bundle 
+    file, so they can be compared without loading contents. RIDs are 
+    indexed by type in memory. The index is built from the cache 
+    directory on first use, then updated on each write and delete, so 
+    listing RIDs doesn't rescan the directory. The backend assumes it 
+    has exclusive access to the cache directory.
+    """
+    
+    directory_path: Path
+    fsync_policy: FsyncPolicy = FsyncPolicy.NONE
+    group_commit_interval: float = 0.1
+    codec: BundleCodec = field(default_factory=BundleCodec)
+    layout: CacheLayout = CacheLayout.FLAT
+    shard_depth: int = 2
+    
+    _committer: GroupCommitter | None = field(init=False, default=None)
+    # bundle files awaiting the next group commit, to their temporary files
+    _pending: dict[Path, Path] = field(init=False, default_factory=dict)
+    _dirty_dirs: set[Path] = field(init=False, default_factory=set)
+    # directories known to exist, skips creating them on every write
+    _known_dirs: set[Path] = field(init=False, default_factory=set)
+    _rid_index: dict[RIDType, set[RID]] | None = field(init=False, default=None)
+    _lock: threading.RLock = field(init=False, default_factory=threading.RLock)
+    # guards pending files, held while renaming them or opening files
+    _pending_lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+    
+    @property
+    def layout_id(self) -> str:
+        """Returns identifier of the configured layout and shard depth."""
+        if self.layout == CacheLayout.FLAT:
+            return CacheLayout.FLAT
+        return f"{self.layout}:{self.shard_depth}"
+    
+    def shard_path_to(self, rid: RID) -> Path:
+        """Returns path to the directory storing an RID's bundle file."""
+        if self.layout == CacheLayout.FLAT:
+            return self.directory_path
+        
+        rid_hash = sha256_hash(str(rid))
+        return self.directory_path.joinpath(*(
+            rid_hash[i * 2:i * 2 + 2] for i in range(self.shard_depth)
+        ))
+    
+    def file_path_to(self, rid: RID) -> Path:
+        encoded_rid_str = b64_encode(str(rid))
+        return self.shard_path_to(rid) / (encoded_rid_str + ".json")
+    
+    @staticmethod
+    def rid_from_file_name(file_name: str) -> RID | None:
+        """Returns RID decoded from bundle file name, `None` for other files."""
+        # skips temporary files from in progress writes
+        if not file_name.endswith(".json"):
+            return None
+        
+        encoded_rid_str = file_name.split(".")[0]
+        rid_str = b64_decode(encoded_rid_str)
+        return RID.from_string(rid_str)
+    
+    def open(self) -> None:
+        if self.fsync_policy == FsyncPolicy.GROUP_COMMIT:
+            self._committer = GroupCommitter(
+                commit=self.commit,
+                interval=self.group_commit_interval
+            )
+            self._committer.start()
+    
+    def close(self) -> None:
+        if self._committer:
+            self._committer.stop()
+            self._committer = None
+    
+    @staticmethod
+    def _fsync_path(path: Path) -> None:
+        """Syncs file or directory at path, if it (still) exists."""
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except (FileNotFoundError, PermissionError):
+            return
+        
+        try:
+            os.fsync(fd)
+        except OSError:
+            # directories can't be synced on some platforms
+            pass
+        finally:
+            os.close(fd)
+    
+    def commit(self) -> None:
+        """Syncs files written since last commit, then renames them into place.
+        
+        Directories changed since last commit are synced once, after all 
+        files are renamed.
+        """
+        with self._pending_lock:
+            pending = dict(self._pending)
+        
+        for tmp_path in pending.values():
+            self._fsync_path(tmp_path)
+        
+        renamed_dirs = set()
+        with self._pending_lock:
+            for file_path, tmp_path in pending.items():
+                # rewritten or deleted since, the temporary file is gone
+                if self._pending.get(file_path) != tmp_path:
+                    continue
+                os.replace(tmp_path, file_path)
+                del self._pending[file_path]
+                renamed_dirs.add(file_path.parent)
+        
+        with self._lock:
+            dirty_dirs, self._dirty_dirs = self._dirty_dirs, set()
+        
+        for dir_path in dirty_dirs | renamed_dirs:
+            self._fsync_path(dir_path)
+    
+    def _make_dir(self, dir_path: Path) -> set[Path]:
+        """Creates directory if missing, returns directories whose entries changed."""
+        changed_dirs = {dir_path}
+        with self._lock:
+            if dir_path in self._known_dirs:
+                return changed_dirs
+        
+        if not dir_path.is_dir():
+            os.makedirs(dir_path, exist_ok=True)
+            parent_path = dir_path
+            while parent_path != self.directory_path:
+                parent_path = parent_path.parent
+                changed_dirs.add(parent_path)
+        
+        with self._lock:
+            self._known_dirs.add(dir_path)
+        return changed_dirs
+    
+    def _sync_dirs(self, dir_paths: set[Path]) -> None:
+        """Syncs changed directories, according to the fsync policy."""
+        if self.fsync_policy == FsyncPolicy.PER_WRITE:
+            for dir_path in dir_paths:
+                self._fsync_path(dir_path)
+        
+        elif self.fsync_policy == FsyncPolicy.GROUP_COMMIT:
+            with self._lock:
+                self._dirty_dirs.update(dir_paths)
+    
+    def _write_file(self, bundle: Bundle) -> set[Path]:
+        """Writes bundle file, returns directories whose entries changed."""
+        file_path = self.file_path_to(bundle.manifest.rid)
+        changed_dirs = self._make_dir(file_path.parent)
+        fd, tmp_path = tempfile.mkstemp(
+            dir=file_path.parent, suffix=".tmp")
+        
+        try:
+            with os.fdopen(fd, mode="wb") as f:
+                f.write(self.codec.encode(bundle))
+                
+                if self.fsync_policy == FsyncPolicy.PER_WRITE:
+                    f.flush()
+                    os.fsync(f.fileno())
+            
+            if self.fsync_policy != FsyncPolicy.GROUP_COMMIT:
+                os.replace(tmp_path, file_path)
+        
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        
+        if self.fsync_policy == FsyncPolicy.GROUP_COMMIT:
+            # renamed into place by the next commit, once synced
+            with self._pending_lock:
+                replaced_path = self._pending.get(file_path)
+                self._pending[file_path] = Path(tmp_path)
+            self._remove_tmp(replaced_path)
+        
+        self._index_add(bundle.manifest.rid)
+        return changed_dirs
+    
+    @staticmethod
+    def _remove_tmp(tmp_path: Path | None) -> None:
+        """Removes temporary file of a write that won't be committed."""
+        if tmp_path is None:
+            return
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+    
+    def _open(self, rid: RID) -> BinaryIO:
+        """Opens an RID's bundle file, or its temporary file until committed."""
+        file_path = self.file_path_to(rid)
+        with self._pending_lock:
+            return open(self._pending.get(file_path, file_path), mode="rb")
+    
+    def write(self, bundle: Bundle) -> None:
+        self._sync_dirs(self._write_file(bundle))
+    
+    def write_many(self, bundles: list[Bundle]) -> None:
+        changed_dirs = set()
+        for bundle in bundles:
+            changed_dirs.update(self._write_file(bundle))
+        self._sync_dirs(changed_dirs)
+    
+    def exists(self, rid: RID) -> bool:
+        file_path = self.file_path_to(rid)
+        with self._pending_lock:
+            return file_path in self._pending or os.path.exists(file_path)
+    
+    def read(self, rid: RID) -> Bundle | None:
+        try:
+            with self._open(rid) as f:
+                file_content = f.read()
+        except FileNotFoundError:
+            return None
+        
+        try:
+            return self.codec.decode(file_content)
+        except ValueError as exc:
+            log.warning(f"Failed to decode cached bundle for {rid!r}: {exc}")
+            return None
+    
+    def read_manifest(self, rid: RID) -> Manifest | None:
+        try:
+            with self._open(rid) as f:
+                return self.codec.read_manifest(f)
+        except FileNotFoundError:
+            return None
+        except ValueError as exc:
+            log.warning(f"Failed to decode cached manifest for {rid!r}: {exc}")
+            return None
+    
+    def read_sizes(self, rids: list[RID]) -> dict[RID, int]:
+        sizes = {}
+        for rid in rids:
+            file_path = self.file_path_to(rid)
+            try:
+                with self._pending_lock:
+                    sizes[rid] = os.path.getsize(self._pending.get(file_path, file_path))
+            except FileNotFoundError:
+                continue
+        return sizes
+    
+    def scan_rids(self) -> Iterator[RID]:
+        """Yields RIDs decoded from every file in the cache directory.
+        
+        Shards are walked one directory at a time, so RIDs are yielded
+        without listing the whole cache first.
+        """
+        for _, _, file_names in os.walk(self.directory_path):
+            for file_name in file_names:
+                rid = self.rid_from_file_name(file_name)
+                if rid is not None:
+                    yield rid
+        
+        # new bundles awaiting commit only exist as temporary files
+        with self._pending_lock:
+            pending_paths = list(self._pending)
+        for file_path in pending_paths:
+            if not file_path.exists():
+                yield self.rid_from_file_name(file_path.name)
+    
+    @property
+    def rid_index(self) -> dict[RIDType, set[RID]]:
+        """Returns RID type index, building it on first use."""
+        with self._lock:
+            if self._rid_index is None:
+                rid_index: dict[RIDType, set[RID]] = {}
+                for rid in self.scan_rids():
+                    rid_index.setdefault(type(rid), set()).add(rid)
+                self._rid_index = rid_index
+            return self._rid_index
+    
+    def _index_add(self, rid: RID):
+        with self._lock:
+            if self._rid_index is not None:
+                self._rid_index.setdefault(type(rid), set()).add(rid)
+    
+    def _index_remove(self, rid: RID):
+        with self._lock:
+            if self._rid_index is None:
+                return
+            rids = self._rid_index.get(type(rid))
+            if rids is None:
+                return
+            rids.discard(rid)
+            if not rids:
+                del self._rid_index[type(rid)]
+    
+    def list_rids(self, rid_types: list[RIDType] | None = None) -> list[RID]:
+        with self._lock:
+            rid_index = self.rid_index
+            if not rid_types:
+                return [rid for rids in rid_index.values() for rid in rids]
+            
+            return [
+                rid
+                for rid_type in set(rid_types)
+                for rid in rid_index.get(rid_type, ())
+            ]
+    
+    def iter_rids(self, rid_types: list[RIDType] | None = None) -> Iterator[RID]:
+        """Yields stored RIDs, scanning lazily if the index isn't built yet."""
+        with self._lock:
+            indexed = self._rid_index is not None
+        
+        if indexed:
+            yield from self.list_rids(rid_types)
+            return
+        
+        rid_type_set = set(rid_types) if rid_types else None
+        for rid in self.scan_rids():
+            if rid_type_set is None or type(rid) in rid_type_set:
+                yield rid
+    
+    def count(self) -> int:
+        with self._lock:
+            return sum(len(rids) for rids in self.rid_index.values())
+    
+    def delete(self, rid: RID) -> None:
+        file_path = self.file_path_to(rid)
+        with self._pending_lock:
+            tmp_path = self._pending.pop(file_path, None)
+        self._remove_tmp(tmp_path)
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            pass
+        self._index_remove(rid)
+        self._sync_dirs({file_path.parent})
+    
+    def drop(self) -> None:
+        with self._lock:
+            try:
+                shutil.rmtree(self.directory_path)
+            except FileNotFoundError:
+                pass
+            self._rid_index = {}
+            self._known_dirs.clear()
+            with self._pending_lock:
+                self._pending.clear()
+    
+    def meta_path_to(self, key: str) -> Path:
+        return self.directory_path / f".{key}"
+    
+    def read_meta(self, key: str) -> str | None:
+        try:
+            return self.meta_path_to(key).read_text()
+        except FileNotFoundError:
+            return None
+    
+    def write_meta(self, key: str, value: str) -> None:
+        """Writes metadata file, synced unless the fsync policy is `NONE`."""
+        meta_path = self.meta_path_to(key)
+        changed_dirs = self._make_dir(self.directory_path)
+        fd, tmp_path = tempfile.mkstemp(
+            dir=self.directory_path, suffix=".tmp")
+        
+        try:
+            with os.fdopen(fd, mode="w") as f:
+                f.write(value)
+                
+                if self.fsync_policy != FsyncPolicy.NONE:
+                    f.flush()
+                    os.fsync(f.fileno())
+            
+            os.replace(tmp_path, meta_path)
+        
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        
+        if self.fsync_policy != FsyncPolicy.NONE:
+            for dir_path in changed_dirs:
+                self._fsync_path(dir_path)
+    
+    @classmethod
+    def from_directory(cls, directory_path: Path) -> "FileCacheBackend":
+        """Returns backend for a cache directory in its recorded layout."""
+        try:
+            layout_id = (directory_path / LAYOUT_MARKER).read_text().strip()
+        except FileNotFoundError:
+            return cls(directory_path)
+        
+        layout, _, shard_depth = layout_id.partition(":")
+        return cls(
+            directory_path,
+            layout=CacheLayout(layout),
+            shard_depth=int(shard_depth or 0)
+        )
+    
+    def migrate_layout(self) -> int:
+        """Moves bundle files into the configured layout, returns number moved.
+        
+        The layout of the cache directory is recorded in a marker file, 
+        so files are only walked when the configured layout changes. The
+        marker is written after all files are moved, so an interrupted
+        migration resumes on the next call.
+        """
+        prev_layout_id = self.from_directory(self.directory_path).layout_id
+        if prev_layout_id == self.layout_id:
+            return 0
+        
+        if not self.directory_path.is_dir():
+            self._write_layout_marker()
+            return 0
+        
+        log.info(f"Migrating cache directory '{self.directory_path}' from {prev_layout_id} to {self.layout_id} layout...")
+        
+        num_moved = 0
+        changed_dirs = set()
+        with self._lock:
+            self._known_dirs.clear()
+            for dir_path, _, file_names in os.walk(self.directory_path):
+                for file_name in file_names:
+                    rid = self.rid_from_file_name(file_name)
+                    if rid is None:
+                        continue
+                    
+                    src_path = Path(dir_path) / file_name
+                    dest_path = self.file_path_to(rid)
+                    if src_path == dest_path:
+                        continue
+                    
+                    changed_dirs.update(self._make_dir(dest_path.parent))
+                    changed_dirs.add(src_path.parent)
+                    os.replace(src_path, dest_path)
+                    num_moved += 1
+            
+            # removes shard directories left empty by the migration
+            for dir_path, _, _ in os.walk(self.directory_path, topdown=False):
+                if Path(dir_path) == self.directory_path:
+                    continue
+                try:
+                    os.rmdir(dir_path)
+                    changed_dirs.discard(Path(dir_path))
+                    changed_dirs.add(Path(dir_path).parent)
+                except OSError:
+                    pass
+            self._known_dirs.clear()
+        
+        self._sync_dirs(changed_dirs)
+        self.commit()
+        
+        self._write_layout_marker()
+        
+        log.info(f"Moved {num_moved} bundle file(s)")
+        return num_moved
+    
+    def _write_layout_marker(self) -> None:
+        marker_path = self.directory_path / LAYOUT_MARKER
+        if self.layout == CacheLayout.FLAT:
+            try:
+                os.remove(marker_path)
+            except FileNotFoundError:
+                pass
+        else:
+            os.makedirs(self.directory_path, exist_ok=True)
+            marker_path.write_text(self.layout_id)
@@ -0,0 +1,45 @@
+import threading
+from dataclasses import dataclass, field
+from typing import Callable
+
+import structlog
+
+log = structlog.stdlib.get_logger()
+
+
+@dataclass
+class GroupCommitter:
+    """Calls `commit` every `interval` seconds on a background thread.
+    
+    Used by backends with a group commit fsync policy, so writes made
+    within one interval share a single sync.
+    """
+    
+    commit: Callable[[], None]
+    interval: float
+    
+    thread: threading.Thread | None = field(init=False, default=None)
+    exit_event: threading.Event = field(init=False, default_factory=threading.Event)
+    
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        
+        self.exit_event.clear()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        """Stops the thread, committing any remaining writes."""
+        self.exit_event.set()
+        if self.thread and self.thread.is_alive():
+            self.thread.join()
+        self.thread = None
+        self.commit()
+    
+    def run(self):
+        while not self.exit_event.wait(self.interval):
+            try:
+                self.commit()
+            except Exception as exc:
+                log.error("Group commit failed: " + str(exc))
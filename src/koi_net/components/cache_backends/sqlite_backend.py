@@ -0,0 +1,296 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Generator
+
+from pydantic import ValidationError
+from pydantic_core import to_json
+from rid_lib.core import RID, RIDType
+from rid_lib.ext import Bundle, Manifest
+
+from koi_net.config.koi_net_config import FsyncPolicy
+from ..interfaces import CacheBackend
+from .group_commit import GroupCommitter
+
+
+# stays under SQLite's limit on host parameters per statement
+MAX_PARAMS = 900
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bundles (
+    rid TEXT PRIMARY KEY,
+    rid_type TEXT NOT NULL,
+    manifest TEXT NOT NULL,
+    contents TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS bundles_rid_type ON bundles (rid_type);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+@dataclass
+class SqliteCacheBackend(CacheBackend):
+    """Stores all bundles in a single SQLite database file.
+    
+    Bundles are indexed by RID string and RID type, so listing RIDs of
+    a type doesn't scan the whole cache. Manifests and contents are 
+    stored in separate columns, so manifests can be read without 
+    loading contents. The database runs in WAL mode, and a single 
+    connection is shared between threads behind a lock.
+    
+    Transactions are always atomic. The fsync policy sets how often 
+    the WAL is synced: `PER_WRITE` uses `synchronous=FULL`, syncing 
+    every commit. `NONE` and `GROUP_COMMIT` use `synchronous=NORMAL`, 
+    syncing at checkpoints, and `GROUP_COMMIT` additionally runs a 
+    checkpoint every `group_commit_interval` seconds after writes.
+    """
+    
+    db_path: Path
+    fsync_policy: FsyncPolicy = FsyncPolicy.NONE
+    group_commit_interval: float = 0.1
+    
+    _committer: GroupCommitter | None = field(init=False, default=None)
+    _dirty: bool = field(init=False, default=False)
+    _conn: sqlite3.Connection | None = field(init=False, default=None)
+    _lock: threading.RLock = field(init=False, default_factory=threading.RLock)
+    
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Returns database connection, opening it on first use."""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                self.db_path,
+                check_same_thread=False,
+                isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            if self.fsync_policy == FsyncPolicy.PER_WRITE:
+                conn.execute("PRAGMA synchronous=FULL")
+            else:
+                conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+    
+    @contextmanager
+    def transaction(self) -> Generator[sqlite3.Connection, None, None]:
+        """Context managed transaction, rolls back on exception."""
+        with self._lock:
+            conn = self.conn
+            conn.execute("BEGIN")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            self._dirty = True
+    
+    def commit(self) -> None:
+        """Checkpoints the WAL if written to since the last commit."""
+        with self._lock:
+            if not self._dirty or self._conn is None:
+                return
+            self._conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+            self._dirty = False
+    
+    def open(self) -> None:
+        if self.fsync_policy == FsyncPolicy.GROUP_COMMIT:
+            self._committer = GroupCommitter(
+                commit=self.commit,
+                interval=self.group_commit_interval
+            )
+            self._committer.start()
+    
+    @staticmethod
+    def _row_from_bundle(bundle: Bundle) -> tuple[str, str, str, str]:
+        rid = bundle.manifest.rid
+        return (
+            str(rid),
+            str(type(rid)),
+            bundle.manifest.model_dump_json(),
+            to_json(bundle.contents).decode()
+        )
+    
+    @staticmethod
+    def _bundle_from_row(manifest_json: str, contents_json: str) -> Bundle | None:
+        try:
+            return Bundle.model_validate_json(
+                '{"manifest": ' + manifest_json + ', "contents": ' + contents_json + '}')
+        except ValidationError:
+            return None
+    
+    def write(self, bundle: Bundle) -> None:
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO bundles (rid, rid_type, manifest, contents) VALUES (?, ?, ?, ?)",
+                self._row_from_bundle(bundle)
+            )
+    
+    def write_many(self, bundles: list[Bundle]) -> None:
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO bundles (rid, rid_type, manifest, contents) VALUES (?, ?, ?, ?)",
+                [self._row_from_bundle(bundle) for bundle in bundles]
+            )
+    
+    def exists(self, rid: RID) -> bool:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT 1 FROM bundles WHERE rid = ?", (str(rid),)
+            ).fetchone()
+        return row is not None
+    
+    def read(self, rid: RID) -> Bundle | None:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT manifest, contents FROM bundles WHERE rid = ?", (str(rid),)
+            ).fetchone()
+        
+        if row is None:
+            return None
+        
+        return self._bundle_from_row(*row)
+    
+    def read_manifest(self, rid: RID) -> Manifest | None:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT manifest FROM bundles WHERE rid = ?", (str(rid),)
+            ).fetchone()
+        
+        if row is None:
+            return None
+        
+        try:
+            return Manifest.model_validate_json(row[0])
+        except ValidationError:
+            return None
+    
+    def read_many(self, rids: list[RID]) -> dict[RID, Bundle]:
+        rows = {}
+        with self._lock:
+            for i in range(0, len(rids), MAX_PARAMS):
+                rid_strs = [str(rid) for rid in rids[i:i + MAX_PARAMS]]
+                placeholders = ", ".join("?" for _ in rid_strs)
+                rows.update(
+                    (rid_str, (manifest_json, contents_json))
+                    for rid_str, manifest_json, contents_json in self.conn.execute(
+                        f"SELECT rid, manifest, contents FROM bundles WHERE rid IN ({placeholders})",
+                        rid_strs
+                    )
+                )
+        
+        bundles = {}
+        for rid in rids:
+            row = rows.get(str(rid))
+            if row is None:
+                continue
+            
+            bundle = self._bundle_from_row(*row)
+            if bundle is not None:
+                bundles[rid] = bundle
+        return bundles
+    
+    def read_manifests(self, rids: list[RID]) -> dict[RID, Manifest]:
+        rows = {}
+        with self._lock:
+            for i in range(0, len(rids), MAX_PARAMS):
+                rid_strs = [str(rid) for rid in rids[i:i + MAX_PARAMS]]
+                placeholders = ", ".join("?" for _ in rid_strs)
+                rows.update(self.conn.execute(
+                    f"SELECT rid, manifest FROM bundles WHERE rid IN ({placeholders})",
+                    rid_strs
+                ))
+        
+        manifests = {}
+        for rid in rids:
+            manifest_json = rows.get(str(rid))
+            if manifest_json is None:
+                continue
+            
+            try:
+                manifests[rid] = Manifest.model_validate_json(manifest_json)
+            except ValidationError:
+                continue
+        return manifests
+    
+    def read_sizes(self, rids: list[RID]) -> dict[RID, int]:
+        rows = {}
+        with self._lock:
+            for i in range(0, len(rids), MAX_PARAMS):
+                rid_strs = [str(rid) for rid in rids[i:i + MAX_PARAMS]]
+                placeholders = ", ".join("?" for _ in rid_strs)
+                rows.update(self.conn.execute(
+                    f"SELECT rid, length(CAST(manifest AS BLOB)) + length(CAST(contents AS BLOB)) FROM bundles WHERE rid IN ({placeholders})",
+                    rid_strs
+                ))
+        
+        return {
+            rid: rows[str(rid)]
+            for rid in rids
+            if str(rid) in rows
+        }
+    
+    def list_rids(self, rid_types: list[RIDType] | None = None) -> list[RID]:
+        with self._lock:
+            if not rid_types:
+                rows = self.conn.execute("SELECT rid FROM bundles").fetchall()
+            else:
+                type_strs = [str(rid_type) for rid_type in rid_types]
+                placeholders = ", ".join("?" for _ in type_strs)
+                rows = self.conn.execute(
+                    f"SELECT rid FROM bundles WHERE rid_type IN ({placeholders})",
+                    type_strs
+                ).fetchall()
+        
+        return [RID.from_string(rid_str) for (rid_str,) in rows]
+    
+    def count(self) -> int:
+        with self._lock:
+            (num_rows,) = self.conn.execute(
+                "SELECT COUNT(*) FROM bundles").fetchone()
+        return num_rows
+    
+    def delete(self, rid: RID) -> None:
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM bundles WHERE rid = ?", (str(rid),))
+    
+    def delete_many(self, rids: list[RID]) -> None:
+        with self.transaction() as conn:
+            conn.executemany(
+                "DELETE FROM bundles WHERE rid = ?",
+                [(str(rid),) for rid in rids]
+            )
+    
+    def read_meta(self, key: str) -> str | None:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+    
+    def write_meta(self, key: str, value: str) -> None:
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (key, value)
+            )
+    
+    def drop(self) -> None:
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM bundles")
+    
+    def close(self) -> None:
+        if self._committer:
+            self._committer.stop()
+            self._committer = None
+        
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,62 @@
+import threading
+from dataclasses import dataclass, field
+
+from ..infra import depends_on
+from ..config.base import BaseNodeConfig
+from ..protocol.event import EventType
+from .interfaces import ThreadedComponent
+from .cache import Cache
+from .kobj_queue import KobjQueue
+
+
+@dataclass
+class CacheEvictor(ThreadedComponent):
+    """Thread worker that evicts bundles exceeding cache limits.
+
+    Runs every `eviction_interval` seconds, or as soon as a write
+    exceeds a limit. Only started when cache limits are configured.
+    """
+
+    config: BaseNodeConfig
+    cache: Cache
+    kobj_queue: KobjQueue
+
+    exit_event: threading.Event = field(init=False, default_factory=threading.Event)
+
+    def evict(self):
+        """Evicts bundles selected by the cache limiter."""
+        rids = self.cache.limiter.select_evictions()
+        if not rids:
+            return
+
+        if self.config.koi_net.cache.forget_on_evict:
+            self.log.info(f"Evicting {len(rids)} bundle(s) from cache through pipeline")
+            for rid in rids:
+                self.kobj_queue.push(rid=rid, event_type=EventType.FORGET)
+        else:
+            self.log.info(f"Evicting {len(rids)} bundle(s) from cache")
+            self.cache.delete_many(rids)
+
+    def run(self):
+        over_limit = self.cache.limiter.over_limit
+        while not self.exit_event.is_set():
+            over_limit.wait(self.config.koi_net.cache.eviction_interval)
+            over_limit.clear()
+
+            if self.exit_event.is_set():
+                return
+
+            self.evict()
+
+    @depends_on("cache")
+    def start(self):
+        if not self.cache.limiter.rid_types:
+            return
+
+        self.exit_event.clear()
+        super().start()
+
+    def stop(self):
+        self.exit_event.set()
+        self.cache.limiter.over_limit.set()
+        super().stop()
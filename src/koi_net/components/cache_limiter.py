@@ -0,0 +1,177 @@
+import time
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import structlog
+from rid_lib.core import RID, RIDType
+
+from koi_net.config.koi_net_config import CacheLimitConfig, EvictionPolicy
+
+log = structlog.stdlib.get_logger()
+
+
+@dataclass
+class RidTypeUsage:
+    """Tracks cached bundles of a single limited RID type.
+    
+    Entries map RIDs to their size and write time, ordered by last read
+    for the `LRU` policy, or by last write for the `TTL` policy, so the
+    next bundle to evict is always first. RIDs pending eviction map to 
+    the time they were selected.
+    """
+    
+    limit: CacheLimitConfig
+    
+    entries: OrderedDict[RID, tuple[int, float]] = field(init=False, default_factory=OrderedDict)
+    num_bytes: int = field(init=False, default=0)
+    # RIDs selected for eviction, but not deleted yet
+    pending: dict[RID, float] = field(init=False, default_factory=dict)
+    pending_bytes: int = field(init=False, default=0)
+    
+    def add(self, rid: RID, size: int, written_at: float):
+        self.remove(rid)
+        self.entries[rid] = (size, written_at)
+        self.num_bytes += size
+    
+    def remove(self, rid: RID):
+        entry = self.entries.pop(rid, None)
+        if entry is None:
+            return
+        
+        self.num_bytes -= entry[0]
+        if self.pending.pop(rid, None) is not None:
+            self.pending_bytes -= entry[0]
+    
+    def mark_pending(self, rid: RID, selected_at: float):
+        self.pending[rid] = selected_at
+        self.pending_bytes += self.entries[rid][0]
+    
+    def release_pending(self, before: float) -> int:
+        """Releases RIDs selected for eviction before a time, returns number released.
+        
+        Released bundles weren't deleted, like when a handler stopped 
+        their `FORGET`. They're kept as if just written, so they count 
+        towards the limit again, but aren't the next to evict.
+        """
+        released = [rid for rid, selected_at in self.pending.items() if selected_at < before]
+        now = time.time()
+        for rid in released:
+            self.add(rid, self.entries[rid][0], now)
+        return len(released)
+    
+    def is_over_limit(self) -> bool:
+        """Returns whether bundles not pending eviction exceed the limit."""
+        if self.limit.max_items is not None:
+            if len(self.entries) - len(self.pending) > self.limit.max_items:
+                return True
+        
+        if self.limit.max_bytes is not None:
+            if self.num_bytes - self.pending_bytes > self.limit.max_bytes:
+                return True
+        
+        return False
+
+@dataclass
+class CacheLimiter:
+    """Tracks cache usage of RID types with capacity limits.
+    
+    RID types without a limit aren't tracked. `over_limit` is set when
+    a write exceeds a limit, to wake the evictor early. Bundles selected
+    for eviction, but not deleted within `eviction_timeout` seconds, are
+    released to be tracked again.
+    """
+    
+    limits: list[CacheLimitConfig]
+    eviction_timeout: float = 60.0
+    
+    usage: dict[RIDType, RidTypeUsage] = field(init=False, default_factory=dict)
+    over_limit: threading.Event = field(init=False, default_factory=threading.Event)
+    _lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+    
+    def __post_init__(self):
+        for limit in self.limits:
+            self.usage[limit.rid_type] = RidTypeUsage(limit)
+    
+    @property
+    def rid_types(self) -> list[RIDType]:
+        return list(self.usage.keys())
+    
+    def tracks(self, rid: RID) -> bool:
+        return type(rid) in self.usage
+    
+    def record_write(self, rid: RID, size: int, written_at: float | None = None):
+        usage = self.usage.get(type(rid))
+        if usage is None:
+            return
+        
+        with self._lock:
+            usage.add(rid, size, written_at or time.time())
+            if usage.is_over_limit():
+                self.over_limit.set()
+    
+    def record_read(self, rid: RID):
+        usage = self.usage.get(type(rid))
+        if usage is None or usage.limit.policy != EvictionPolicy.LRU:
+            return
+        
+        with self._lock:
+            if rid in usage.entries:
+                usage.entries.move_to_end(rid)
+    
+    def record_delete(self, rid: RID):
+        usage = self.usage.get(type(rid))
+        if usage is None:
+            return
+        
+        with self._lock:
+            usage.remove(rid)
+    
+    def clear(self):
+        with self._lock:
+            for rid_type, usage in self.usage.items():
+                self.usage[rid_type] = RidTypeUsage(usage.limit)
+    
+    def select_evictions(self) -> list[RID]:
+        """Returns RIDs to evict, and marks them as pending eviction.
+        
+        Selects expired bundles of `TTL` limited types, then the first
+        bundles in eviction order until each type is within its limit.
+        Pending evictions older than `eviction_timeout` are released first.
+        """
+        now = time.time()
+        selected = []
+        with self._lock:
+            for usage in self.usage.values():
+                num_released = usage.release_pending(now - self.eviction_timeout)
+                if num_released:
+                    log.warning(f"Released {num_released} bundle(s) of type {usage.limit.rid_type} not evicted within {self.eviction_timeout}s")
+                
+                for rid, (_, written_at) in usage.entries.items():
+                    if rid in usage.pending:
+                        continue
+                    
+                    is_expired = (
+                        usage.limit.policy == EvictionPolicy.TTL and
+                        now - written_at >= usage.limit.ttl
+                    )
+                    
+                    if not is_expired and not usage.is_over_limit():
+                        break
+                    
+                    usage.mark_pending(rid, now)
+                    selected.append(rid)
+        
+        return selected
+    
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Returns item and byte counts for each limited RID type."""
+        with self._lock:
+            return {
+                str(rid_type): {
+                    "items": len(usage.entries),
+                    "bytes": usage.num_bytes,
+                    "pending": len(usage.pending)
+                }
+                for rid_type, usage in self.usage.items()
+            }
@@ -33,7 +33,8 @@ class Effector:
         self.deref_handlers.append(handler)
     
     def _try_cache(self, rid: RID) -> tuple[Bundle, BundleSource] | None:
-        bundle = self.cache.read(rid)
+        # dereferenced bundles are returned to callers, who may mutate them
+        bundle = self.cache.read(rid, copy=True)
         
         if bundle:
             self.log.debug("Cache hit")
@@ -58,3 +58,4 @@ class ErrorHandler:
             case ErrorType.InvalidKey: ...
             case ErrorType.InvalidSignature: ...
             case ErrorType.InvalidTarget: ...
+            case ErrorType.Overloaded: ...
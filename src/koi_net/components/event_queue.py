@@ -3,6 +3,7 @@ from queue import Queue
 
 from rid_lib.types import KoiNetNode
 
+from koi_net.config.base import BaseNodeConfig
 from koi_net.protocol.event import Event
 
 
@@ -14,8 +15,19 @@ class QueuedEvent:
 @dataclass
 class EventQueue:
     """Queue for outgoing network events."""
+    config: BaseNodeConfig
+    
     q: Queue[QueuedEvent] = field(init=False, default_factory=Queue)
     
+    def is_full(self) -> bool:
+        """Returns whether the queue bound is reached.
+        
+        The bound isn't enforced by `push`, kobj workers wait for the 
+        queue to drain before processing more knowledge.
+        """
+        max_size = self.config.koi_net.event_worker.max_queue_size
+        return max_size is not None and self.q.qsize() >= max_size
+    
     def push(self, event: Event, target: KoiNetNode):
         """Pushes event to queue of specified node.
         
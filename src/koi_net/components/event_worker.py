@@ -1,6 +1,6 @@
 import queue
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from rid_lib.ext import Cache
 from rid_lib.types import KoiNetNode
@@ -8,7 +8,7 @@ from rid_lib.types import KoiNetNode
 from ..infra import depends_on
 from ..config.base import BaseNodeConfig
 from ..protocol.node import NodeProfile, NodeType
-from ..exceptions import RequestError
+from ..exceptions import RemoteOverloadedError, RequestError
 
 from .event_queue import EventQueue
 from .request_handler import RequestHandler
@@ -34,13 +34,32 @@ class EventProcessingWorker(ThreadedComponent):
     poll_event_buf: EventBuffer
     broadcast_event_buf: EventBuffer
         
+    # time until which overloaded nodes aren't sent events
+    retry_after: dict[KoiNetNode, float] = field(init=False, default_factory=dict)
+    
     def flush_and_broadcast(self, target: KoiNetNode, force_flush: bool = False):
-        """Broadcasts all events to target in event buffer."""
+        """Broadcasts all events to target in event buffer.
+        
+        If the target is overloaded, events are kept in the buffer and 
+        sent again after `max_wait_time`.
+        """
+        
+        if not force_flush and time.time() < self.retry_after.get(target, 0):
+            return
         
         # TODO: deal with automated retries when unreachable node's buffer is full
         try:
-            with self.broadcast_event_buf.safe_flush(target, force_flush) as events:
+            with self.broadcast_event_buf.safe_flush(target, force_flush=force_flush) as events:
                 self.request_handler.broadcast_events(target, events=events)
+        except RemoteOverloadedError:
+            if force_flush:
+                self.log.warning("Target is overloaded, event buffer reset")
+                return
+            
+            self.log.warning("Target is overloaded, keeping events buffered to retry later")
+            now = time.time()
+            self.retry_after[target] = now + self.config.koi_net.event_worker.max_wait_time
+            self.broadcast_event_buf.start_time[target] = now
         except RequestError:
             self.log.warning("Failed to reach target, event buffer reset")
             pass
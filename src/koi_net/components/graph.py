@@ -1,47 +1,382 @@
+import os
+import tempfile
+import threading
 from dataclasses import dataclass, field
 from logging import Logger
+from pathlib import Path
 from typing import Literal
 
 import networkx as nx
+from pydantic import BaseModel, ValidationError
 from rid_lib import RIDType
-from rid_lib.ext import Cache
+from rid_lib.ext import Bundle
 from rid_lib.types import KoiNetEdge, KoiNetNode
 
-from koi_net.protocol.edge import EdgeProfile, EdgeStatus
+from koi_net.config.base import BaseNodeConfig
+from koi_net.infra import depends_on
+from koi_net.protocol.edge import EdgeProfile, EdgeStatus, EdgeType
+from koi_net.protocol.event import EventType
+from koi_net.protocol.knowledge_object import KnowledgeObject
+from koi_net.protocol.node import NodeProfile
+from .cache import Cache
 from .identity import NodeIdentity
 
 
+class GraphSnapshot(BaseModel):
+    """Saved network graph, current while the cache generation matches.
+    
+    Edges refer to their endpoints by index in `nodes`, so each node 
+    RID is stored and parsed once.
+    """
+    
+    generation: str
+    # graph nodes, with whether they are cached, and their profile
+    nodes: list[tuple[KoiNetNode, bool, NodeProfile | None]]
+    # edge RID, source and target index, edge type, status, and RID types
+    edges: list[tuple[KoiNetEdge, int, int, EdgeType, EdgeStatus, list[RIDType]]]
+
+
 @dataclass
 class NetworkGraph:
-    """Graph functions for this node's view of its network."""
+    """Graph functions for this node's view of its network.
+    
+    The graph is generated from the cache on startup, then updated
+    from each processed node and edge knowledge object. Graph nodes 
+    are cached KOI nodes, and the endpoints of cached KOI edges. Node
+    profiles, and the fields of edge profiles, are stored as attributes.
+    
+    The graph is saved to a snapshot on shutdown, and loaded from it 
+    on startup instead of reading the cache, if the cache generation
+    hasn't changed since.
+    
+    Neighbors of this node are indexed by edge direction, status, and
+    RID type, so finding the subscribers of an RID type only visits 
+    those subscribers.
+    """
     
     log: Logger
+    config: BaseNodeConfig
+    root_dir: Path
     cache: Cache
     identity: NodeIdentity
     
     dg: nx.DiGraph = field(init=False, default_factory=nx.DiGraph)
+    # endpoints of each edge in the graph, by edge RID
+    edge_endpoints: dict[KoiNetEdge, tuple[KoiNetNode, KoiNetNode]] = field(init=False, default_factory=dict)
+    # neighbors by (direction, status), then by RID type, `None` for all types
+    neighbor_index: dict[tuple[str, EdgeStatus], dict[RIDType | None, set[KoiNetNode]]] = field(init=False, default_factory=dict)
+    _lock: threading.RLock = field(init=False, default_factory=threading.RLock)
+    
+    @property
+    def snapshot_path(self) -> Path | None:
+        if self.config.koi_net.graph_snapshot_path is None:
+            return None
+        return self.root_dir / self.config.koi_net.graph_snapshot_path
     
+    @depends_on("cache")
     def start(self):
-        self.generate()
+        if not self.load_snapshot():
+            self.generate()
+    
+    @depends_on("kobj_worker", "cache_evictor")
+    def stop(self):
+        self.save_snapshot()
+    
+    def clear(self):
+        with self._lock:
+            self.dg.clear()
+            self.edge_endpoints.clear()
+            self.neighbor_index.clear()
         
     def generate(self):
         """Generates directed graph from cached KOI nodes and edges."""
         self.log.debug("Generating network graph")
-        self.dg.clear()
-        for rid in self.cache.list_rids():
+        nodes = []
+        edges = []
+        for rid in self.cache.list_rids(rid_types=[KoiNetNode, KoiNetEdge]):
             if type(rid) == KoiNetNode:
-                self.dg.add_node(rid)
-                self.log.debug(f"Added node {rid!r}")
-                
+                node_bundle = self.cache.read(rid)
+                if not node_bundle:
+                    self.log.warning(f"Failed to load {rid!r}")
+                    continue
+                nodes.append((rid, self.node_profile_from(node_bundle)))
+            
             elif type(rid) == KoiNetEdge:
                 edge_bundle = self.cache.read(rid)
                 if not edge_bundle:
                     self.log.warning(f"Failed to load {rid!r}")
                     continue
                 edge_profile = edge_bundle.validate_contents(EdgeProfile)
-                self.dg.add_edge(edge_profile.source, edge_profile.target, rid=rid)
-                self.log.debug(f"Added edge {rid!r} ({edge_profile.source} -> {edge_profile.target})")
+                edges.append((
+                    rid,
+                    edge_profile.source,
+                    edge_profile.target,
+                    edge_profile.edge_type,
+                    edge_profile.status,
+                    edge_profile.rid_types
+                ))
+        
+        self.load(nodes, edges)
         self.log.debug("Done")
+    
+    def load(
+        self,
+        nodes: list[tuple[KoiNetNode, NodeProfile | None]],
+        edges: list[tuple[KoiNetEdge, KoiNetNode, KoiNetNode, EdgeType, EdgeStatus, list[RIDType]]]
+    ):
+        """Replaces graph with cached nodes and edges, in bulk.
+        
+        Nodes are given with their profile, and edges as their RID, 
+        source, target, edge type, status, and RID types. Equivalent to
+        adding each node then edge, without indexing neighbors after 
+        every edge.
+        """
+        with self._lock:
+            self.clear()
+            self.dg.add_nodes_from(
+                (rid, {"cached": True, "profile": node_profile})
+                for rid, node_profile in nodes
+            )
+            for rid, source, target, edge_type, status, rid_types in edges:
+                self.dg.add_edge(
+                    source, target,
+                    **self.edge_attrs(rid, edge_type, status, rid_types)
+                )
+                self.edge_endpoints[rid] = (source, target)
+                
+            if self.identity.rid in self.dg:
+                for endpoints in [
+                    *self.dg.out_edges(self.identity.rid), 
+                    *self.dg.in_edges(self.identity.rid)
+                ]:
+                    self._update_neighbor_index(*endpoints, add=True)
+    
+    def load_snapshot(self) -> bool:
+        """Loads graph from snapshot, returns whether it was loaded.
+        
+        Snapshots saved at a different cache generation are stale, and
+        aren't loaded.
+        """
+        if self.snapshot_path is None:
+            return False
+        
+        try:
+            snapshot = GraphSnapshot.model_validate_json(
+                self.snapshot_path.read_bytes())
+        except FileNotFoundError:
+            return False
+        except ValidationError as exc:
+            self.log.warning(f"Failed to load graph snapshot '{self.snapshot_path}': {exc}")
+            return False
+        
+        if snapshot.generation != self.cache.generation:
+            self.log.info("Graph snapshot is stale, regenerating network graph")
+            return False
+        
+        # edge endpoints are stored as indexes into the snapshot node list
+        node_rids = [rid for rid, _, _ in snapshot.nodes]
+        self.load(
+            nodes=[
+                (rid, node_profile) 
+                for rid, cached, node_profile in snapshot.nodes 
+                if cached
+            ],
+            edges=[
+                (rid, node_rids[source], node_rids[target], edge_type, status, rid_types)
+                for rid, source, target, edge_type, status, rid_types in snapshot.edges
+            ]
+        )
+        self.log.info(f"Loaded graph snapshot with {len(snapshot.nodes)} node(s) and {len(snapshot.edges)} edge(s)")
+        return True
+    
+    def save_snapshot(self):
+        """Saves graph to snapshot, at the current cache generation."""
+        if self.snapshot_path is None:
+            return
+        
+        with self._lock:
+            node_indices = {rid: i for i, rid in enumerate(self.dg.nodes)}
+            snapshot = GraphSnapshot.model_construct(
+                generation=self.cache.observe_generation(),
+                nodes=[
+                    (rid, bool(node_data.get("cached")), node_data.get("profile"))
+                    for rid, node_data in self.dg.nodes(data=True)
+                ],
+                edges=[
+                    (
+                        edge_data["rid"],
+                        node_indices[source],
+                        node_indices[target],
+                        edge_data["edge_type"],
+                        edge_data["status"],
+                        list(edge_data["rid_types"])
+                    )
+                    for source, target, edge_data in self.dg.edges(data=True)
+                ]
+            )
+        
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(
+            dir=self.snapshot_path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, mode="wb") as f:
+                f.write(snapshot.model_dump_json().encode())
+            os.replace(tmp_path, self.snapshot_path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        
+        self.log.info(f"Saved graph snapshot with {len(snapshot.nodes)} node(s) and {len(snapshot.edges)} edge(s)")
+    
+    def node_profile_from(self, bundle: Bundle) -> NodeProfile | None:
+        """Returns node profile from bundle, or `None` if invalid."""
+        try:
+            return bundle.validate_contents(NodeProfile)
+        except ValidationError:
+            self.log.warning(f"Invalid node profile in {bundle.rid!r}")
+            return None
+    
+    def apply(self, kobj: KnowledgeObject):
+        """Updates graph from a processed node or edge knowledge object.
+        
+        Applies the cache operation set by the normalized event type, 
+        so the graph matches what `generate()` would produce, without 
+        rereading the cache.
+        """
+        with self._lock:
+            if kobj.normalized_event_type in (EventType.NEW, EventType.UPDATE):
+                if type(kobj.rid) == KoiNetNode:
+                    self.add_node(kobj.rid, self.node_profile_from(kobj.bundle))
+                elif type(kobj.rid) == KoiNetEdge:
+                    edge_profile = kobj.bundle.validate_contents(EdgeProfile)
+                    self.add_edge(kobj.rid, edge_profile)
+            
+            elif kobj.normalized_event_type == EventType.FORGET:
+                if type(kobj.rid) == KoiNetNode:
+                    self.remove_node(kobj.rid)
+                elif type(kobj.rid) == KoiNetEdge:
+                    self.remove_edge(kobj.rid)
+    
+    def add_node(self, rid: KoiNetNode, node_profile: NodeProfile | None = None):
+        """Adds cached node and its profile to graph."""
+        with self._lock:
+            self.dg.add_node(rid, cached=True, profile=node_profile)
+        self.log.debug(f"Added node {rid!r}")
+    
+    def remove_node(self, rid: KoiNetNode):
+        """Removes node from graph, unless it is still an edge endpoint."""
+        with self._lock:
+            if rid not in self.dg:
+                return
+            
+            if self.dg.degree(rid) > 0:
+                self.dg.nodes[rid]["cached"] = False
+                self.dg.nodes[rid]["profile"] = None
+                self.log.debug(f"Kept uncached node {rid!r}, still an edge endpoint")
+                return
+            
+            self.dg.remove_node(rid)
+        self.log.debug(f"Removed node {rid!r}")
+    
+    @staticmethod
+    def edge_attrs(
+        rid: KoiNetEdge,
+        edge_type: EdgeType,
+        status: EdgeStatus,
+        rid_types: list[RIDType]
+    ) -> dict:
+        # RID types are frozen, so edge attributes can't be mutated in place
+        return {
+            "rid": rid,
+            "edge_type": edge_type,
+            "status": status,
+            "rid_types": frozenset(rid_types)
+        }
+    
+    def add_edge(self, rid: KoiNetEdge, edge_profile: EdgeProfile):
+        """Adds cached edge to graph, replacing its previous version.
+        
+        The edge type, status, and RID types of the edge profile are 
+        stored as edge attributes, so neighbors and edge profiles can be
+        found without reading edges from the cache.
+        """
+        with self._lock:
+            endpoints = (edge_profile.source, edge_profile.target)
+            if self.edge_endpoints.get(rid, endpoints) != endpoints:
+                self.remove_edge(rid)
+            
+            self._update_neighbor_index(*endpoints, add=False)
+            self.dg.add_edge(*endpoints, **self.edge_attrs(
+                rid, 
+                edge_profile.edge_type, 
+                edge_profile.status, 
+                edge_profile.rid_types
+            ))
+            self.edge_endpoints[rid] = endpoints
+            self._update_neighbor_index(*endpoints, add=True)
+        self.log.debug(f"Added edge {rid!r} ({edge_profile.source} -> {edge_profile.target})")
+    
+    def remove_edge(self, rid: KoiNetEdge):
+        """Removes edge from graph, and endpoints no longer in the graph."""
+        with self._lock:
+            endpoints = self.edge_endpoints.pop(rid, None)
+            if endpoints is None:
+                return
+            
+            # another edge RID may have replaced this one between the endpoints
+            if self.dg.get_edge_data(*endpoints, default={}).get("rid") == rid:
+                self._update_neighbor_index(*endpoints, add=False)
+                self.dg.remove_edge(*endpoints)
+            
+            for node_rid in endpoints:
+                if (
+                    node_rid in self.dg and
+                    self.dg.degree(node_rid) == 0 and
+                    not self.dg.nodes[node_rid].get("cached")
+                ):
+                    self.dg.remove_node(node_rid)
+        self.log.debug(f"Removed edge {rid!r}")
+    
+    def _update_neighbor_index(
+        self, 
+        source: KoiNetNode, 
+        target: KoiNetNode, 
+        add: bool
+    ):
+        """Adds or removes the graph edge from source to target in the neighbor index.
+        
+        Only edges this node belongs to are indexed. There is at most one
+        graph edge per direction between two nodes, so each neighbor is 
+        indexed by a single edge per direction.
+        """
+        edge_data = self.dg.get_edge_data(source, target)
+        if not edge_data:
+            return
+        
+        entries = []
+        if source == self.identity.rid:
+            entries.append(("out", target))
+        if target == self.identity.rid:
+            entries.append(("in", source))
+        
+        for direction, neighbor in entries:
+            rid_type_index = self.neighbor_index.setdefault(
+                (direction, edge_data["status"]), {})
+            
+            for rid_type in (None, *edge_data["rid_types"]):
+                if add:
+                    rid_type_index.setdefault(rid_type, set()).add(neighbor)
+                    continue
+                
+                neighbors = rid_type_index.get(rid_type)
+                if neighbors is None:
+                    continue
+                neighbors.discard(neighbor)
+                if not neighbors:
+                    del rid_type_index[rid_type]
         
     def get_edge(
         self, 
@@ -49,13 +384,52 @@ class NetworkGraph:
         target: KoiNetNode
     ) -> KoiNetEdge | None:
         """Returns edge RID given the RIDs of a source and target node."""
-        if (source, target) in self.dg.edges:
-            edge_data = self.dg.get_edge_data(source, target)
-            if edge_data:
-                return edge_data.get("rid")
+        with self._lock:
+            if (source, target) in self.dg.edges:
+                edge_data = self.dg.get_edge_data(source, target)
+                if edge_data:
+                    return edge_data.get("rid")
 
         return None
 
+    def get_edge_profile(self, rid: KoiNetEdge) -> EdgeProfile | None:
+        """Returns profile of a cached edge, without reading the cache."""
+        with self._lock:
+            endpoints = self.edge_endpoints.get(rid)
+            if endpoints is None:
+                return None
+            
+            edge_data = self.dg.get_edge_data(*endpoints, default={})
+            if edge_data.get("rid") != rid:
+                return None
+            
+            return EdgeProfile(
+                source=endpoints[0],
+                target=endpoints[1],
+                edge_type=edge_data["edge_type"],
+                status=edge_data["status"],
+                rid_types=list(edge_data["rid_types"])
+            )
+    
+    def get_node_profile(self, rid: KoiNetNode) -> NodeProfile | None:
+        """Returns profile of a cached node, without reading the cache."""
+        with self._lock:
+            if rid not in self.dg:
+                return None
+            return self.dg.nodes[rid].get("profile")
+    
+    def get_node_profiles(self) -> dict[KoiNetNode, NodeProfile]:
+        """Returns profiles of all cached nodes, without reading the cache.
+        
+        Profiles are shared with the graph, and MUST NOT be mutated.
+        """
+        with self._lock:
+            return {
+                rid: node_data["profile"]
+                for rid, node_data in self.dg.nodes(data=True)
+                if node_data.get("profile") is not None
+            }
+    
     def get_edges(
         self,
         direction: Literal["in", "out"] | None = None,
@@ -67,21 +441,22 @@ class NetworkGraph:
         """
         
         edges = []
-        if (direction is None or direction == "out") and self.dg.out_edges:
-            out_edges = self.dg.out_edges(self.identity.rid)
-            edges.extend(out_edges)
+        edge_rids = []
+        with self._lock:
+            if (direction is None or direction == "out") and self.dg.out_edges:
+                out_edges = self.dg.out_edges(self.identity.rid)
+                edges.extend(out_edges)
         
-        if (direction is None or direction == "in") and self.dg.in_edges:
-            in_edges = self.dg.in_edges(self.identity.rid)
-            edges.extend(in_edges)
+            if (direction is None or direction == "in") and self.dg.in_edges:
+                in_edges = self.dg.in_edges(self.identity.rid)
+                edges.extend(in_edges)
         
-        edge_rids = []
-        for edge in edges:
-            edge_data = self.dg.get_edge_data(*edge)
-            if not edge_data: continue
-            edge_rid = edge_data.get("rid")
-            if not edge_rid: continue
-            edge_rids.append(edge_rid)
+            for edge in edges:
+                edge_data = self.dg.get_edge_data(*edge)
+                if not edge_data: continue
+                edge_rid = edge_data.get("rid")
+                if not edge_rid: continue
+                edge_rids.append(edge_rid)
        
         return edge_rids
     
@@ -95,28 +470,19 @@ class NetworkGraph:
         
         All neighboring nodes returned by default, specify `direction` 
         to restrict to neighbors connected by incoming or outgoing edges
-        only.
+        only. Neighbors are looked up in the neighbor index, without 
+        reading edges from the cache.
         """
         
+        directions = ("in", "out") if direction is None else (direction,)
+        statuses = tuple(EdgeStatus) if status is None else (status,)
+        
         neighbors = set()
-        for edge_rid in self.get_edges(direction):
-            edge_bundle = self.cache.read(edge_rid)
-            
-            if not edge_bundle: 
-                self.log.warning(f"Failed to find edge {edge_rid!r} in cache")
-                continue
-            
-            edge_profile = edge_bundle.validate_contents(EdgeProfile)
-                        
-            if status and edge_profile.status != status:
-                continue
-            
-            if allowed_type and allowed_type not in edge_profile.rid_types:
-                continue
-            
-            if edge_profile.target == self.identity.rid:
-                neighbors.add(edge_profile.source)
-            elif edge_profile.source == self.identity.rid:
-                neighbors.add(edge_profile.target)
-            
+        with self._lock:
+            for edge_direction in directions:
+                for edge_status in statuses:
+                    rid_type_index = self.neighbor_index.get(
+                        (edge_direction, edge_status), {})
+                    neighbors.update(rid_type_index.get(allowed_type, ()))
+        
         return list(neighbors)
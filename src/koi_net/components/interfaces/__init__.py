@@ -1,6 +1,8 @@
+from .cache_backend import CacheBackend
 from .deref_handler import DerefHandler
 from .knowledge_handler import (
     KnowledgeHandler, 
+    AsyncKnowledgeHandler,
     HandlerType, 
     STOP_CHAIN,
     StopChain
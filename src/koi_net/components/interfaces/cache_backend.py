@@ -0,0 +1,140 @@
+from typing import Iterator
+
+from rid_lib.core import RID, RIDType
+from rid_lib.ext import Bundle, Manifest
+
+
+class CacheBackend:
+    """Storage backend used by the `Cache` component.
+    
+    Backends are responsible for persisting bundles by RID. The cache
+    component delegates all storage operations to its backend, which is
+    selected by the `koi_net.cache.backend` config value.
+    """
+    
+    def write(self, bundle: Bundle) -> None:
+        """Writes bundle to storage, overwriting any previous version."""
+        ...
+    
+    def read(self, rid: RID) -> Bundle | None:
+        """Returns bundle for RID, or `None` if not found."""
+        ...
+    
+    def read_manifest(self, rid: RID) -> Manifest | None:
+        """Returns manifest for RID, or `None` if not found.
+        
+        Backends should override this to avoid loading contents.
+        """
+        bundle = self.read(rid)
+        return bundle.manifest if bundle else None
+    
+    def read_many(self, rids: list[RID]) -> dict[RID, Bundle]:
+        """Returns bundles for RIDs which were found, in request order."""
+        bundles = {}
+        for rid in rids:
+            bundle = self.read(rid)
+            if bundle is not None:
+                bundles[rid] = bundle
+        return bundles
+    
+    def read_manifests(self, rids: list[RID]) -> dict[RID, Manifest]:
+        """Returns manifests for RIDs which were found, in request order."""
+        manifests = {}
+        for rid in rids:
+            manifest = self.read_manifest(rid)
+            if manifest is not None:
+                manifests[rid] = manifest
+        return manifests
+    
+    def read_sizes(self, rids: list[RID]) -> dict[RID, int]:
+        """Returns stored size in bytes for RIDs which were found.
+        
+        Backends should override this to avoid loading bundles.
+        """
+        sizes = {}
+        for rid in rids:
+            bundle = self.read(rid)
+            if bundle is not None:
+                sizes[rid] = len(bundle.model_dump_json())
+        return sizes
+    
+    def write_many(self, bundles: list[Bundle]) -> None:
+        """Writes bundles to storage, as a single transaction if supported."""
+        for bundle in bundles:
+            self.write(bundle)
+    
+    def exists(self, rid: RID) -> bool:
+        """Returns whether a bundle is stored for RID."""
+        ...
+    
+    def list_rids(self, rid_types: list[RIDType] | None = None) -> list[RID]:
+        """Returns stored RIDs, optionally restricted to `rid_types`."""
+        ...
+    
+    def iter_rids(self, rid_types: list[RIDType] | None = None) -> Iterator[RID]:
+        """Yields stored RIDs, optionally restricted to `rid_types`.
+        
+        Backends should override this to avoid listing all RIDs at once.
+        """
+        yield from self.list_rids(rid_types)
+    
+    def count(self) -> int:
+        """Returns number of stored bundles."""
+        return len(self.list_rids())
+    
+    def delete(self, rid: RID) -> None:
+        """Deletes bundle for RID, ignored if not found."""
+        ...
+    
+    def delete_many(self, rids: list[RID]) -> None:
+        """Deletes bundles for RIDs, as a single transaction if supported."""
+        for rid in rids:
+            self.delete(rid)
+    
+    def drop(self) -> None:
+        """Deletes all stored bundles."""
+        ...
+    
+    def import_from(
+        self, 
+        source: "CacheBackend", 
+        chunk_size: int = 1000
+    ) -> int:
+        """Copies all bundles from another backend, returns number copied."""
+        num_copied = 0
+        rids = []
+        for rid in source.iter_rids():
+            rids.append(rid)
+            if len(rids) < chunk_size:
+                continue
+            
+            num_copied += self._import_chunk(source, rids)
+            rids = []
+        
+        if rids:
+            num_copied += self._import_chunk(source, rids)
+        return num_copied
+    
+    def _import_chunk(self, source: "CacheBackend", rids: list[RID]) -> int:
+        bundles = source.read_many(rids)
+        self.write_many(list(bundles.values()))
+        return len(bundles)
+    
+    def read_meta(self, key: str) -> str | None:
+        """Returns metadata value stored under key, or `None` if not found.
+        
+        Backends without metadata storage always return `None`.
+        """
+        return None
+    
+    def write_meta(self, key: str, value: str) -> None:
+        """Stores metadata value under key, before any later writes."""
+        pass
+    
+    def open(self) -> None:
+        """Prepares the backend for use, called when the cache starts."""
+        pass
+    
+    def close(self) -> None:
+        """Releases resources held by the backend."""
+        pass
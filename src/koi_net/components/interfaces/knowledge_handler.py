@@ -35,7 +35,16 @@ class HandlerType(StrEnum):
 
 @dataclass
 class KnowledgeHandler:
-    """Handles knowledge processing events of the provided types."""
+    """Handles knowledge processing events of the provided types.
+    
+    Handlers receive a copy of the knowledge object by default. Read 
+    only handlers receive the knowledge object itself, without a copy, 
+    and MUST NOT mutate it. To modify it, they return a modified copy,
+    e.g. `kobj.model_copy(update={...})`.
+    
+    Handlers may set a `time_budget` in seconds for each call, overridden
+    by the pipeline config.
+    """
     
     log: Logger
     pipeline: "KnowledgePipeline"
@@ -43,9 +52,24 @@ class KnowledgeHandler:
     handler_type: HandlerType = field(init=False)
     rid_types: tuple[RIDType] = field(init=False, default=())
     event_types: tuple[EventType | None] = field(init=False, default=())
+    read_only: bool = field(init=False, default=False)
+    time_budget: float | None = field(init=False, default=None)
     
     def __post_init__(self):
         self.pipeline.register_handler(self)
     
     def handle(self, kobj: KnowledgeObject) -> KnowledgeObject | None | StopChain:
         ...
+
+
+@dataclass
+class AsyncKnowledgeHandler(KnowledgeHandler):
+    """Knowledge handler with a coroutine `handle` method.
+    
+    Awaited on the event loop by the async pipeline, so handlers waiting
+    on I/O don't block other knowledge objects. Handlers MUST NOT make 
+    blocking calls. The sync pipeline runs them with `asyncio.run`.
+    """
+    
+    async def handle(self, kobj: KnowledgeObject) -> KnowledgeObject | None | StopChain:
+        ...
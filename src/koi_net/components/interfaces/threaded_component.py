@@ -33,10 +33,10 @@ class ThreadedComponent:
         else:
             self.log.debug(f"Component {self.__class__.__name__} has already stopped")
     
-    def _run(self):
+    def _run(self, *args):
         with self.logging_context.bound_vars(thread=self.__class__.__name__):
             try:
-                self.run()
+                self.run(*args)
             except Exception as exc:
                 self.log.error("Error in threaded component: " + str(exc))
                 self.exception_queue.put(exc)
@@ -20,13 +20,13 @@ class BasicManifestHandler(KnowledgeHandler):
         `NEW` or `UPDATE` depending on whether the RID was previously known.
         """
         
-        prev_bundle = self.cache.read(kobj.rid)
+        prev_manifest = self.cache.read_manifest(kobj.rid)
 
-        if prev_bundle:
-            if kobj.manifest.sha256_hash == prev_bundle.manifest.sha256_hash:
+        if prev_manifest:
+            if kobj.manifest.sha256_hash == prev_manifest.sha256_hash:
                 self.log.debug("Hash of incoming manifest is same as existing knowledge, ignoring")
                 return STOP_CHAIN
-            if kobj.manifest.timestamp <= prev_bundle.manifest.timestamp:
+            if kobj.manifest.timestamp <= prev_manifest.timestamp:
                 self.log.debug("Timestamp of incoming manifest is the same or older than existing knowledge, ignoring")
                 return STOP_CHAIN
             
@@ -24,6 +24,7 @@ class EdgeNegotiationHandler(KnowledgeHandler):
     handler_type = HandlerType.Bundle
     rid_types = (KoiNetEdge,)
     event_types = (EventType.NEW, EventType.UPDATE)
+    read_only = True
     
     def handle(self, kobj: KnowledgeObject):
         """Handles edge negotiation process.
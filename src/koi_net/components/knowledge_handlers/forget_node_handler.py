@@ -17,6 +17,7 @@ class ForgetNodeHandler(KnowledgeHandler):
     
     handler_type = HandlerType.Final
     rid_types=(KoiNetNode,)
+    read_only = True
     
     def handle(self, kobj: KnowledgeObject):
         """Removes edges to forgotten nodes."""
@@ -7,7 +7,7 @@ from koi_net.exceptions import RequestError
 from koi_net.config.base import BaseNodeConfig
 from koi_net.infra import depends_on
 from koi_net.protocol.node import NodeProfile, NodeType
-from koi_net.protocol.edge import EdgeProfile, EdgeStatus, EdgeType, generate_edge_bundle
+from koi_net.protocol.edge import EdgeStatus, EdgeType, generate_edge_bundle
 from koi_net.protocol.knowledge_object import KnowledgeObject
 from ..interfaces import KnowledgeHandler, HandlerType
 from ..identity import NodeIdentity
@@ -28,14 +28,13 @@ class NodeContactHandler(KnowledgeHandler):
     
     handler_type = HandlerType.Network
     rid_types = (KoiNetNode,)
+    read_only = True
     
-    def process_node(self, node_rid: KoiNetNode, node_bundle: Bundle):
+    def process_node(self, node_rid: KoiNetNode, node_profile: NodeProfile):
         # prevents nodes from attempting to form a self loop
         if node_rid == self.identity.rid:
             return
         
-        node_profile = node_bundle.validate_contents(NodeProfile)
-        
         # None indicates interest in all types, while an empty list would indicate interest in no types
         if self.config.koi_net.rid_types_of_interest is None:
             available_rid_types = node_profile.provides.event
@@ -56,8 +55,7 @@ class NodeContactHandler(KnowledgeHandler):
         
         # already have an edge established
         if edge_rid:
-            prev_edge_bundle = self.cache.read(edge_rid)
-            edge_profile = prev_edge_bundle.validate_contents(EdgeProfile)
+            edge_profile = self.graph.get_edge_profile(edge_rid)
             
             if set(edge_profile.rid_types) == set(available_rid_types):
                 # no change in rid types
@@ -117,14 +115,10 @@ class NodeContactHandler(KnowledgeHandler):
         subscribing to future node events, and fetch existing nodes to catch 
         up to the current state.
         """
-        self.process_node(kobj.rid, kobj.bundle)
+        self.process_node(kobj.rid, kobj.bundle.validate_contents(NodeProfile))
     
     @depends_on("graph", "kobj_worker")
     def start(self):
         self.log.info("Starting node contact analysis on cached profiles...")
-        for rid in self.cache.list_rids(rid_types=(KoiNetNode,)):
-            bundle = self.cache.read(rid)
-            if not bundle:
-                continue
-            
-            self.process_node(rid, bundle)
\ No newline at end of file
+        for rid, node_profile in self.graph.get_node_profiles().items():
+            self.process_node(rid, node_profile)
\ No newline at end of file
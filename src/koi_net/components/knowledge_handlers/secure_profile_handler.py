@@ -17,6 +17,7 @@ class SecureProfileHandler(KnowledgeHandler):
     handler_type = HandlerType.Bundle
     rid_types = (KoiNetNode,)
     event_types = (EventType.NEW, EventType.UPDATE)
+    read_only = True
     
     def handle(self, kobj: KnowledgeObject):
         node_profile = kobj.bundle.validate_contents(NodeProfile)
@@ -0,0 +1,319 @@
+import os
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO
+
+import structlog
+from pydantic import ValidationError
+
+from koi_net.config.koi_net_config import FsyncPolicy
+from ..protocol.knowledge_object import KnowledgeObject
+from .cache_backends.group_commit import GroupCommitter
+
+log = structlog.stdlib.get_logger()
+
+CHECKPOINT_FILE_NAME = "checkpoint"
+SEGMENT_SUFFIX = ".log"
+
+
+@dataclass
+class KobjJournal:
+    """Append only log of queued knowledge objects, stored on disk.
+    
+    Each queued knowledge object is appended as a record with a sequence
+    number, and removed from `pending` once processed. Records are
+    buffered in memory and written to the current segment file by
+    `commit`. With the `GROUP_COMMIT` fsync policy, commits run every
+    `commit_interval` seconds on a background thread, so queued records
+    share a single sync. Otherwise each record is written when appended,
+    and synced unless the policy is `NONE`.
+    
+    Commits also write a checkpoint: the sequence number of the oldest
+    pending record. Segments holding only older records are deleted.
+    When the current segment grows past `segment_size` bytes, a new one
+    is started and pending records from older segments are copied into
+    it, so those can be deleted too.
+    
+    `wait_for_commit` blocks until records appended so far are written,
+    so callers can wait for the next group commit instead of committing
+    themselves.
+    
+    `open` returns pending records left by a previous run, in order.
+    Records processed after the last checkpoint are replayed again,
+    so replay is at least once.
+    """
+    
+    directory_path: Path
+    fsync_policy: FsyncPolicy = FsyncPolicy.GROUP_COMMIT
+    commit_interval: float = 0.05
+    segment_size: int = 16 * 1024 * 1024
+    
+    # pending knowledge objects by sequence number, in sequence order
+    pending: dict[int, KnowledgeObject] = field(init=False, default_factory=dict)
+    # sequence numbers of pending knowledge objects by object id
+    seqs: dict[int, int] = field(init=False, default_factory=dict)
+    next_seq: int = field(init=False, default=0)
+    checkpoint: int = field(init=False, default=0)
+    # records appended since the last commit
+    buffer: list[tuple[int, KnowledgeObject]] = field(init=False, default_factory=list)
+    # closed segments with the last sequence number written to them
+    closed_segments: list[tuple[Path, int]] = field(init=False, default_factory=list)
+    segment_id: int = field(init=False, default=0)
+    # last sequence number written to a segment, and synced if required
+    committed_seq: int = field(init=False, default=-1)
+    
+    _segment: BinaryIO | None = field(init=False, default=None)
+    _segment_path: Path | None = field(init=False, default=None)
+    _segment_bytes: int = field(init=False, default=0)
+    _last_seq: int = field(init=False, default=-1)
+    _committer: GroupCommitter | None = field(init=False, default=None)
+    # guards in memory state, held briefly by `append` and `remove`
+    _lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+    # guards segment and checkpoint files
+    _write_lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+    # notified when `committed_seq` advances
+    _committed: threading.Condition = field(init=False, default_factory=threading.Condition)
+    
+    @property
+    def checkpoint_path(self) -> Path:
+        return self.directory_path / CHECKPOINT_FILE_NAME
+    
+    def segment_path(self, segment_id: int) -> Path:
+        return self.directory_path / f"{segment_id:010d}{SEGMENT_SUFFIX}"
+    
+    def open(self) -> list[KnowledgeObject]:
+        """Opens journal, returns pending knowledge objects to replay.
+        
+        Pending records are copied into a new segment, and previous
+        segments are deleted.
+        """
+        self.directory_path.mkdir(parents=True, exist_ok=True)
+        
+        try:
+            self.checkpoint = int(self.checkpoint_path.read_text())
+        except (FileNotFoundError, ValueError):
+            self.checkpoint = 0
+        
+        segment_paths = sorted(self.directory_path.glob("*" + SEGMENT_SUFFIX))
+        records: dict[int, KnowledgeObject] = {}
+        for path in segment_paths:
+            records.update(self.read_segment(path))
+        
+        self.next_seq = max(records, default=self.checkpoint - 1) + 1
+        self.next_seq = max(self.next_seq, self.checkpoint)
+        self.segment_id = max(
+            (int(path.stem) for path in segment_paths if path.stem.isdigit()),
+            default=-1
+        ) + 1
+        
+        with self._lock:
+            for seq in sorted(records):
+                kobj = records[seq]
+                self.pending[seq] = kobj
+                self.seqs[id(kobj)] = seq
+                self.buffer.append((seq, kobj))
+        
+        self.closed_segments = [(path, self.next_seq - 1) for path in segment_paths]
+        with self._write_lock:
+            self.start_segment()
+            self.write_buffer(force_sync=True)
+            self.delete_segments(self.next_seq)
+        
+        if records:
+            log.info(f"Replaying {len(records)} knowledge object(s) from journal")
+        
+        if self.fsync_policy == FsyncPolicy.GROUP_COMMIT:
+            self._committer = GroupCommitter(
+                commit=self.commit,
+                interval=self.commit_interval
+            )
+            self._committer.start()
+        
+        return list(records[seq] for seq in sorted(records))
+    
+    def close(self):
+        """Commits remaining records, and closes the current segment."""
+        if self._committer:
+            self._committer.stop()
+            self._committer = None
+        else:
+            self.commit()
+        
+        with self._write_lock:
+            if self._segment:
+                self._segment.close()
+                self._segment = None
+    
+    def read_segment(self, path: Path) -> dict[int, KnowledgeObject]:
+        """Returns records at or after the checkpoint from a segment file.
+        
+        Skips invalid lines, like a record partially written in a crash.
+        """
+        records = {}
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    log.warning(f"Skipping incomplete record in journal segment {path.name}")
+                    continue
+                
+                try:
+                    seq_str, kobj_json = line.split(b"\t", 1)
+                    seq = int(seq_str)
+                    if seq < self.checkpoint:
+                        continue
+                    records[seq] = KnowledgeObject.model_validate_json(kobj_json)
+                except (ValueError, ValidationError):
+                    log.warning(f"Skipping invalid record in journal segment {path.name}")
+        return records
+    
+    def append(self, kobj: KnowledgeObject):
+        """Appends knowledge object, unless it's already pending."""
+        with self._lock:
+            if id(kobj) in self.seqs:
+                return
+            
+            seq = self.next_seq
+            self.next_seq += 1
+            self.pending[seq] = kobj
+            self.seqs[id(kobj)] = seq
+            self.buffer.append((seq, kobj))
+        
+        if self._committer is None:
+            self.commit()
+    
+    def remove(self, kobj: KnowledgeObject):
+        """Removes processed (or superseded) knowledge object from pending."""
+        with self._lock:
+            seq = self.seqs.pop(id(kobj), None)
+            if seq is not None:
+                del self.pending[seq]
+    
+    def commit(self):
+        """Writes buffered records and checkpoint, rotating segments if needed."""
+        with self._write_lock:
+            if self._segment is None:
+                return
+            
+            self.write_buffer()
+            
+            with self._lock:
+                # pending is in sequence order, the first is the oldest
+                checkpoint = next(iter(self.pending), self.next_seq)
+            
+            if checkpoint > self.checkpoint:
+                self.write_checkpoint(checkpoint)
+                self.delete_segments(checkpoint)
+            
+            if self._segment_bytes >= self.segment_size:
+                self.rotate_segment()
+    
+    def write_buffer(self, force_sync: bool = False):
+        """Writes records appended since last write to current segment."""
+        with self._lock:
+            records, self.buffer = self.buffer, []
+        
+        if records:
+            data = b"".join(
+                b"%d\t%s\n" % (seq, kobj.model_dump_json().encode())
+                for seq, kobj in records
+            )
+            self._segment.write(data)
+            self._segment_bytes += len(data)
+            self._segment.flush()
+            self._last_seq = max(self._last_seq, records[-1][0])
+        
+        if records or force_sync:
+            if force_sync or self.fsync_policy != FsyncPolicy.NONE:
+                os.fsync(self._segment.fileno())
+    
+        if records:
+            with self._committed:
+                self.committed_seq = max(self.committed_seq, records[-1][0])
+                self._committed.notify_all()
+    
+    def wait_for_commit(self):
+        """Waits until records appended so far are written to a segment.
+        
+        Returns early if the journal is closed.
+        """
+        with self._lock:
+            seq = self.next_seq - 1
+        
+        with self._committed:
+            while self.committed_seq < seq and self._segment is not None:
+                self._committed.wait(self.commit_interval)
+    
+    def start_segment(self):
+        """Closes the current segment, and starts writing a new one."""
+        if self._segment:
+            self._segment.close()
+            self.closed_segments.append((self._segment_path, self._last_seq))
+        
+        self._segment_path = self.segment_path(self.segment_id)
+        self.segment_id += 1
+        self._segment = open(self._segment_path, "ab")
+        self._segment_bytes = 0
+        self._last_seq = -1
+        self.sync_directory()
+    
+    def rotate_segment(self):
+        """Starts a new segment, copying pending records from older segments."""
+        self.start_segment()
+        
+        with self._lock:
+            # includes buffered records, which are pending too
+            self.buffer = list(self.pending.items())
+        
+        self.write_buffer(force_sync=True)
+        self.delete_segments(self.next_seq)
+        # copied records don't count towards the segment size
+        self._segment_bytes = 0
+    
+    def delete_segments(self, checkpoint: int):
+        """Deletes closed segments holding only records before checkpoint."""
+        deleted = False
+        remaining = []
+        for path, last_seq in self.closed_segments:
+            if last_seq < checkpoint:
+                path.unlink(missing_ok=True)
+                deleted = True
+            else:
+                remaining.append((path, last_seq))
+        self.closed_segments = remaining
+        
+        if deleted:
+            self.sync_directory()
+    
+    def write_checkpoint(self, checkpoint: int):
+        fd, tmp_path = tempfile.mkstemp(
+            dir=self.directory_path, suffix=".tmp")
+        
+        try:
+            with os.fdopen(fd, mode="w") as f:
+                f.write(str(checkpoint))
+            os.replace(tmp_path, self.checkpoint_path)
+        
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        
+        self.checkpoint = checkpoint
+    
+    def sync_directory(self):
+        """Syncs journal directory, unless the fsync policy is `NONE`."""
+        if self.fsync_policy == FsyncPolicy.NONE:
+            return
+        
+        fd = os.open(self.directory_path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        except OSError:
+            # directories can't be synced on some platforms
+            pass
+        finally:
+            os.close(fd)
@@ -1,23 +1,214 @@
+import time
 import threading
+from collections import deque
 from dataclasses import dataclass, field
 from logging import Logger
+from pathlib import Path
 from queue import Queue
+from typing import Any, Callable
 
 from rid_lib.core import RID
 from rid_lib.ext import Bundle, Manifest
 from rid_lib.types import KoiNetNode
 
+from ..infra import depends_on
+from ..config.base import BaseNodeConfig
+from ..config.koi_net_config import KobjLane
 from ..protocol.event import Event, EventType
 from ..protocol.knowledge_object import KnowledgeObject
+from .kobj_journal import KobjJournal
+
+
+class LaneQueue(Queue):
+    """Queue serving knowledge objects from weighted priority lanes.
+    
+    Lanes are served round robin, each lane up to its weight in a row 
+    while other lanes are waiting. The oldest item waiting longer than 
+    `max_wait` seconds is always served first, so no lane is starved. 
+    Items queued for an RID join the lane of any queued items for the 
+    same RID, keeping them in order. Items `lane_for` doesn't assign a 
+    lane, like `STOP_WORKER`, keep their FIFO position: items queued 
+    after them are only served once they have been.
+    """
+    
+    def __init__(
+        self, 
+        lane_for: Callable[[Any], KobjLane | None],
+        weights: dict[KobjLane, int],
+        max_wait: float
+    ):
+        self.lane_for = lane_for
+        self.weights = weights
+        self.max_wait = max_wait
+        super().__init__()
+    
+    def _init(self, maxsize):
+        # items with their queue time, sequence number, and RID lane entry
+        self.lanes: dict[KobjLane, deque[tuple[float, int, Any, list]]] = {
+            lane: deque() for lane in KobjLane
+        }
+        # items without a lane, with their sequence number
+        self.tail: deque[tuple[int, Any]] = deque()
+        self.seq = 0
+        # lane and number of queued items for each RID
+        self.rid_lanes: dict[RID, list] = {}
+        # lane currently served, rotation starts from the first lane
+        self.lane = list(KobjLane)[-1]
+        self.credit = 0
+    
+    def _qsize(self):
+        return sum(len(items) for items in self.lanes.values()) + len(self.tail)
+    
+    def _put(self, item):
+        self.seq += 1
+        lane = self.lane_for(item)
+        if lane is None:
+            self.tail.append((self.seq, item))
+            return
+        
+        rid_lane = self.rid_lanes.setdefault(item.rid, [lane, 0])
+        rid_lane[1] += 1
+        self.lanes[rid_lane[0]].append((time.monotonic(), self.seq, item, rid_lane))
+    
+    def _get(self):
+        # only items queued before the oldest item without a lane are served
+        before = self.tail[0][0] if self.tail else None
+        lane = self.next_lane(before)
+        if lane is None:
+            return self.tail.popleft()[1]
+        
+        _, _, item, rid_lane = self.lanes[lane].popleft()
+        rid_lane[1] -= 1
+        if rid_lane[1] == 0:
+            del self.rid_lanes[item.rid]
+        return item
+    
+    def next_lane(self, before: int | None = None) -> KobjLane | None:
+        """Returns lane to serve next, or `None` if all are empty.
+        
+        With `before`, lanes are only served while their next item was
+        queued before that sequence number.
+        """
+        ready = []
+        oldest = None
+        oldest_time = None
+        for lane, items in self.lanes.items():
+            if items and (before is None or items[0][1] < before):
+                ready.append(lane)
+                if oldest_time is None or items[0][0] < oldest_time:
+                    oldest, oldest_time = lane, items[0][0]
+        
+        if oldest is None:
+            return None
+        if time.monotonic() - oldest_time >= self.max_wait:
+            return oldest
+        
+        if self.credit <= 0 or self.lane not in ready:
+            lanes = list(KobjLane)
+            start = lanes.index(self.lane) + 1
+            self.lane = next(
+                lane for lane in lanes[start:] + lanes[:start]
+                if lane in ready
+            )
+            self.credit = self.weights.get(self.lane, 1)
+        
+        self.credit -= 1
+        return self.lane
 
 
 @dataclass
 class KobjQueue:
-    """Queue for knowledge objects entering the processing pipeline."""
+    """Queue for knowledge objects entering the processing pipeline.
+    
+    Split into one shard for each kobj worker thread. Knowledge objects 
+    are assigned to shards by RID hash, so knowledge about the same RID 
+    is always processed in order by the same thread. Knowledge about 
+    `control_rid_types` (nodes and edges) always goes to the first 
+    shard, since edges depend on the nodes they connect. Within a shard, 
+    knowledge objects wait in priority lanes by RID type and origin, so 
+    protocol traffic isn't delayed by bulk knowledge.
+    
+    If coalescing is enabled, only one knowledge object per RID waits in 
+    the queue. Pushing knowledge about a queued RID replaces the queued 
+    knowledge object when it supersedes it, workers `take` the latest 
+    one when dequeuing.
+    
+    If a journal is configured, queued knowledge objects are written to 
+    it until workers mark them processed, and replayed into the queue 
+    when it starts.
+    """
     log: Logger
     shutdown_signal: threading.Event
+    config: BaseNodeConfig
+    root_dir: Path
+    
+    shards: list[LaneQueue] = field(init=False)
+    # latest knowledge about each queued RID, when coalescing
+    pending: dict[RID, KnowledgeObject] = field(init=False, default_factory=dict)
+    # number of pushed knowledge objects merged into queued ones
+    num_coalesced: int = field(init=False, default=0)
+    journal: KobjJournal | None = field(init=False, default=None)
+    _lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+    
+    def __post_init__(self):
+        worker_config = self.config.koi_net.kobj_worker
+        self.shards = [
+            LaneQueue(
+                lane_for=self.lane_for,
+                weights=worker_config.lane_weights,
+                max_wait=worker_config.max_lane_wait
+            ) for _ in range(worker_config.num_workers)
+        ]
+    
+    def start(self):
+        worker_config = self.config.koi_net.kobj_worker
+        if not worker_config.journal_directory_path:
+            return
+        
+        self.journal = KobjJournal(
+            directory_path=self.root_dir / worker_config.journal_directory_path,
+            fsync_policy=worker_config.journal_fsync_policy,
+            commit_interval=worker_config.journal_commit_interval,
+            segment_size=worker_config.journal_segment_size
+        )
+        for kobj in self.journal.open():
+            self.enqueue(kobj)
+    
+    @depends_on("kobj_worker", "event_worker")
+    def stop(self):
+        if self.journal:
+            self.journal.close()
+            self.journal = None
+    
+    def shard_for(self, rid: RID) -> LaneQueue:
+        """Returns queue shard for knowledge about an RID."""
+        if type(rid) in self.config.koi_net.kobj_worker.control_rid_types:
+            return self.shards[0]
+        return self.shards[hash(rid) % len(self.shards)]
+    
+    def lane_for(self, item: Any) -> KobjLane | None:
+        """Returns priority lane of a queued knowledge object."""
+        if not isinstance(item, KnowledgeObject):
+            return None
+        if type(item.rid) in self.config.koi_net.kobj_worker.control_rid_types:
+            return KobjLane.CONTROL
+        if item.source is None:
+            return KobjLane.LOCAL
+        return KobjLane.REMOTE
+    
+    def is_full(self) -> bool:
+        """Returns whether the queue bound is reached.
+        
+        The bound isn't enforced by `push`, knowledge generated while 
+        processing the queue must always be accepted.
+        """
+        max_size = self.config.koi_net.kobj_worker.max_queue_size
+        return max_size is not None and self.unfinished_tasks >= max_size
     
-    q: Queue[KnowledgeObject] = field(init=False, default_factory=Queue)
+    @property
+    def unfinished_tasks(self) -> int:
+        """Number of queued or in progress knowledge objects in all shards."""
+        return sum(shard.unfinished_tasks for shard in self.shards)
     
     def push(
         self, *,
@@ -50,13 +241,84 @@ class KobjQueue:
         else:
             raise ValueError("One of 'rid', 'manifest', 'bundle', 'event', or 'kobj' must be provided")
         
-        self.q.put(_kobj)
-        self.log.debug(f"Queued {_kobj!r}")
+        self.enqueue(_kobj)
+    
+    def enqueue(self, kobj: KnowledgeObject):
+        """Queues knowledge object, coalescing and journaling if enabled."""
+        if not self.config.koi_net.kobj_worker.coalesce:
+            if self.journal:
+                self.journal.append(kobj)
+            self.shard_for(kobj.rid).put(kobj)
+            self.log.debug(f"Queued {kobj!r}")
+            return
+        
+        with self._lock:
+            queued = self.pending.get(kobj.rid)
+            if queued is not None:
+                if self.supersedes(kobj, queued):
+                    if self.journal:
+                        self.journal.append(kobj)
+                        self.journal.remove(queued)
+                    self.pending[kobj.rid] = kobj
+                elif self.journal:
+                    # only journaled if replayed
+                    self.journal.remove(kobj)
+                self.num_coalesced += 1
+                self.log.debug(f"Coalesced {kobj!r}")
+                return
+            
+            if self.journal:
+                self.journal.append(kobj)
+            self.pending[kobj.rid] = kobj
+            self.shard_for(kobj.rid).put(kobj)
+        self.log.debug(f"Queued {kobj!r}")
+    
+    def sync(self):
+        """Waits until queued knowledge objects are written to the journal.
+        
+        Doesn't commit the journal, with group commit this waits for the 
+        next commit. Blocks, shouldn't be called from an event loop.
+        """
+        if self.journal:
+            self.journal.wait_for_commit()
+    
+    def mark_processed(self, kobj: KnowledgeObject):
+        """Removes knowledge object taken from the queue from the journal."""
+        if self.journal:
+            self.journal.remove(kobj)
+    
+    @staticmethod
+    def supersedes(kobj: KnowledgeObject, queued: KnowledgeObject) -> bool:
+        """Returns whether knowledge object replaces queued knowledge about the same RID.
+        
+        A `FORGET` always replaces queued knowledge. Otherwise the newer 
+        knowledge object replaces the queued one, unless both have 
+        manifests and the queued manifest has a later timestamp.
+        """
+        if kobj.event_type == EventType.FORGET:
+            return True
+        
+        if kobj.manifest and queued.manifest:
+            return kobj.manifest.timestamp >= queued.manifest.timestamp
+        
+        return True
+    
+    def take(self, kobj: KnowledgeObject) -> KnowledgeObject:
+        """Returns latest knowledge about the RID of a dequeued knowledge object.
+        
+        Should be called by workers for each item taken from a shard. 
+        Later pushes about the RID will be queued again.
+        """
+        if not self.config.koi_net.kobj_worker.coalesce:
+            return kobj
+        
+        with self._lock:
+            return self.pending.pop(kobj.rid, kobj)
     
     def wait(self):
-        """Safe join, prevents deadlock if `kobj_worker` fails."""
+        """Safe join of all shards, prevents deadlock if `kobj_worker` fails."""
         while not self.shutdown_signal.wait(0.1):
-            if self.q.unfinished_tasks == 0:
+            if self.unfinished_tasks == 0:
                 return
         
         print("WAIT FAILED")
@@ -1,9 +1,13 @@
+import asyncio
 import queue
-from dataclasses import dataclass
+import threading
+from dataclasses import dataclass, field
 
 from ..config.base import BaseNodeConfig
 from .pipeline import KnowledgePipeline
 from .kobj_queue import KobjQueue
+from .event_queue import EventQueue
+from .request_handler import RequestHandler
 from .interfaces import ThreadedComponent
 from ..infra import depends_on
 
@@ -17,32 +21,110 @@ STOP_WORKER = End()
 
 @dataclass
 class KnowledgeProcessingWorker(ThreadedComponent):
-    """Thread worker that processes the `kobj_queue`."""
+    """Thread workers that process the `kobj_queue`.
+    
+    Runs one thread for each queue shard, set by `num_workers` in config.
+    With an async pipeline, each thread runs an event loop processing 
+    its batches, so up to `batch_size` knowledge objects per thread are
+    in flight at once.
+    """
     
     config: BaseNodeConfig
     kobj_queue: KobjQueue
+    event_queue: EventQueue
     pipeline: KnowledgePipeline
+    request_handler: RequestHandler
+    
+    threads: list[threading.Thread] = field(init=False, default_factory=list)
     
-    @depends_on("server", "poller")
+    @depends_on("kobj_queue", "graph", "pipeline")
+    def start(self):
+        if any(thread.is_alive() for thread in self.threads):
+            self.log.debug(f"Component {self.__class__.__name__} has already started")
+            return
+        
+        self.threads = [
+            threading.Thread(target=self._run, args=(shard,))
+            for shard in self.kobj_queue.shards
+        ]
+        for thread in self.threads:
+            thread.start()
+    
+    @depends_on("server", "poller", "cache_evictor")
     def stop(self):
-        self.kobj_queue.q.put(STOP_WORKER)
-        super().stop()
+        if not any(thread.is_alive() for thread in self.threads):
+            self.log.debug(f"Component {self.__class__.__name__} has already stopped")
+            return
         
-    def run(self):
+        for shard in self.kobj_queue.shards:
+            shard.put(STOP_WORKER)
+        for thread in self.threads:
+            thread.join()
+    
+    def next_batch(self, shard: queue.Queue) -> list:
+        """Returns up to `batch_size` items from the queue.
+        
+        Blocks until the first item is available, then takes queued items 
+        without waiting. A `STOP_WORKER` signal is always the last item.
+        """
+        
+        batch = [shard.get(timeout=self.config.koi_net.kobj_worker.queue_timeout)]
+        while batch[-1] is not STOP_WORKER and len(batch) < self.config.koi_net.kobj_worker.batch_size:
+            try:
+                batch.append(shard.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+    
+    def run(self, shard: queue.Queue):
+        loop = None
+        if self.config.koi_net.pipeline.use_async:
+            loop = asyncio.new_event_loop()
+        
+        try:
+            self.process_shard(shard, loop)
+        finally:
+            if loop:
+                loop.run_until_complete(self.request_handler.close_async_client())
+                loop.close()
+    
+    def process_shard(
+        self, 
+        shard: queue.Queue, 
+        loop: asyncio.AbstractEventLoop | None
+    ):
         while True:
             try:
-                item = self.kobj_queue.q.get(timeout=self.config.koi_net.kobj_worker.queue_timeout)
+                batch = self.next_batch(shard)
                 try:
-                    if item is STOP_WORKER:
+                    stopping = batch[-1] is STOP_WORKER
+                    kobjs = [
+                        self.kobj_queue.take(kobj) 
+                        for kobj in (batch[:-1] if stopping else batch)
+                    ]
+                    
+                    for kobj in kobjs:
+                        self.log.info(f"Dequeued {kobj!r}")
+                    if kobjs:
+                        # lets the kobj queue fill up while the event worker catches up
+                        while self.event_queue.is_full() and not self.shutdown_signal.wait(0.1):
+                            pass
+                        if loop:
+                            loop.run_until_complete(self.pipeline.process_batch_async(kobjs))
+                        else:
+                            self.pipeline.process_batch(kobjs)
+                    
+                        # unfinished kobjs stay journaled, and are replayed after a restart
+                        for kobj in kobjs:
+                            self.kobj_queue.mark_processed(kobj)
+                    
+                    if stopping:
                         self.log.info("Received 'STOP_WORKER' signal, shutting down...")
                         return
                     
-                    self.log.info(f"Dequeued {item!r}")
-                    self.pipeline.process(item)
-                    
                 finally:
-                    self.kobj_queue.q.task_done()
+                    for _ in batch:
+                        shard.task_done()
                     
             except queue.Empty:
                 pass
-
@@ -1,36 +1,171 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from dataclasses import dataclass, field
 from logging import Logger
+from typing import Awaitable, Callable
+from pydantic import ValidationError
+from rid_lib import RID, RIDType
 from rid_lib.types import KoiNetEdge, KoiNetNode
 from rid_lib.ext import Cache
 
+from ..config.base import BaseNodeConfig
+from ..config.koi_net_config import HandlerBudgetAction
 from ..exceptions import RequestError
+from ..infra import depends_on
+from ..protocol.api.models import BundlesPayload, ManifestsPayload
+from ..protocol.edge import EdgeProfile
 from ..protocol.event import EventType
 from .request_handler import RequestHandler
 from .event_queue import EventQueue
 from .graph import NetworkGraph
+from .pipeline_metrics import PipelineMetrics, PipelineStage
 from .interfaces import (
     KnowledgeHandler,
+    AsyncKnowledgeHandler,
     HandlerType, 
     STOP_CHAIN,
     StopChain
 )
 from ..protocol.knowledge_object import KnowledgeObject
 
+# RID types whose knowledge depends on each other, e.g. edges on nodes
+ORDERED_RID_TYPES = (KoiNetNode, KoiNetEdge)
+
+
+@dataclass
+class HandlerCall:
+    """Times a handler call from when it starts running."""
+    
+    start: float | None = None
+    duration: float | None = None
+    started: threading.Event = field(default_factory=threading.Event)
+    # called from the running thread when the call starts
+    on_start: Callable[[], None] | None = None
+    
+    def begin(self):
+        self.start = time.perf_counter()
+        self.started.set()
+        if self.on_start:
+            self.on_start()
+    
+    def end(self):
+        self.duration = time.perf_counter() - self.start
+    
+    def remaining(self, budget: float) -> float:
+        """Returns seconds left in budget since the call started."""
+        return max(0.0, self.start + budget - time.perf_counter())
+
 
 @dataclass
 class KnowledgePipeline:
     log: Logger
+    config: BaseNodeConfig
     cache: Cache
     request_handler: RequestHandler
     event_queue: EventQueue
     graph: NetworkGraph
+    pipeline_metrics: PipelineMetrics
     
     knowledge_handlers: list[KnowledgeHandler] = field(init=False, default_factory=list)
+    # handler chains by handler type, RID type, and event type
+    dispatch_table: dict[tuple[HandlerType, RIDType, EventType | None], tuple[KnowledgeHandler, ...]] = field(init=False, default_factory=dict)
+    # runs sync handlers for the async pipeline
+    executor: ThreadPoolExecutor | None = field(init=False, default=None)
+    # run handlers with enforced time budgets, by handler class name
+    budget_executors: dict[str, ThreadPoolExecutor] = field(init=False, default_factory=dict)
+    # time budget violations by handler class name
+    budget_violations: dict[str, int] = field(init=False, default_factory=dict)
+    disabled_handlers: set[str] = field(init=False, default_factory=set)
+    _lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+    
+    @property
+    def budgets_enforced(self) -> bool:
+        return self.config.koi_net.pipeline.handler_budget_action != HandlerBudgetAction.LOG
+    
+    def start(self):
+        if self.config.koi_net.pipeline.use_async and not self.executor:
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.config.koi_net.pipeline.sync_handler_threads,
+                thread_name_prefix="sync_handler"
+            )
+    
+    @depends_on("kobj_worker")
+    def stop(self):
+        if self.executor:
+            self.executor.shutdown()
+            self.executor = None
+        
+        with self._lock:
+            budget_executors, self.budget_executors = self.budget_executors, {}
+        # handlers which exceeded their budget may never return
+        for executor in budget_executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
     
     def register_handler(self, handler: KnowledgeHandler):
         self.knowledge_handlers.append(handler)
+        self.build_dispatch_table()
         self.log.info(f"Registered knowledge handler {handler.__class__.__name__}")
     
+    def build_dispatch_table(self):
+        """Builds handler chains for every RID type named by a handler.
+        
+        Chains for other RID types are added when first needed. The 
+        table is replaced rather than updated, so concurrent lookups 
+        always see a complete table.
+        """
+        rid_types = {
+            rid_type 
+            for handler in self.knowledge_handlers 
+            for rid_type in handler.rid_types
+        }
+        
+        dispatch_table = {}
+        for handler_type in HandlerType:
+            for rid_type in rid_types:
+                for event_type in (*EventType, None):
+                    key = (handler_type, rid_type, event_type)
+                    dispatch_table[key] = self.filter_handlers(*key)
+        self.dispatch_table = dispatch_table
+    
+    def filter_handlers(
+        self,
+        handler_type: HandlerType,
+        rid_type: RIDType,
+        event_type: EventType | None,
+        handlers: list[KnowledgeHandler] | None = None
+    ) -> tuple[KnowledgeHandler, ...]:
+        """Returns handlers matching types, in registration order.
+        
+        Filters all registered handlers by default, specify `handlers`
+        to filter a subset. Disabled handlers are excluded.
+        """
+        if handlers is None:
+            handlers = self.knowledge_handlers
+        
+        return tuple(
+            handler for handler in handlers
+            if handler.__class__.__name__ not in self.disabled_handlers
+            and handler.handler_type == handler_type
+            and (not handler.rid_types or rid_type in handler.rid_types)
+            and (not handler.event_types or event_type in handler.event_types)
+        )
+    
+    def get_handler_chain(
+        self,
+        handler_type: HandlerType,
+        rid_type: RIDType,
+        event_type: EventType | None
+    ) -> tuple[KnowledgeHandler, ...]:
+        """Returns handlers to call for types, from the dispatch table."""
+        key = (handler_type, rid_type, event_type)
+        handlers = self.dispatch_table.get(key)
+        if handlers is None:
+            handlers = self.filter_handlers(*key)
+            self.dispatch_table[key] = handlers
+        return handlers
+    
     def call_handler_chain(
         self, 
         handler_type: HandlerType,
@@ -43,41 +178,322 @@ class KnowledgePipeline:
         - `None` - to keep the same knowledge object for the next handler in the chain
         - `STOP_CHAIN` - to stop the handler chain and immediately exit the processing pipeline
         
-        Handlers will only be called in the chain if their handler and RID type match that of the inputted knowledge object. 
+        Handlers are passed a copy of the knowledge object, unless they are read only.
+        
+        Handlers will only be called in the chain if their handler and RID type match that of the inputted knowledge object. Matching handlers are looked up in the dispatch table, and looked up again if a handler changes the RID or event type of the knowledge object.
         """
         
-        for handler in self.knowledge_handlers:
-            if handler_type != handler.handler_type: 
-                continue
+        with self.pipeline_metrics.time_stage(handler_type, type(kobj.rid)):
+            return self.run_handler_chain(handler_type, kobj)
+    
+    def run_handler_chain(
+        self, 
+        handler_type: HandlerType,
+        kobj: KnowledgeObject
+    ) -> KnowledgeObject | StopChain:
+        handlers = self.get_handler_chain(
+            handler_type, type(kobj.rid), kobj.event_type)
             
-            if handler.rid_types and type(kobj.rid) not in handler.rid_types:
-                continue
+        i = 0
+        while i < len(handlers):
+            handler = handlers[i]
+            i += 1
             
-            if handler.event_types and kobj.event_type not in handler.event_types:
-                continue
+            resp = self.call_handler(handler_type, handler, kobj)
+            kobj, next_handlers = self.handle_response(handler_type, handler, kobj, resp)
             
-            self.log.debug(f"Calling {handler_type} handler '{handler.__class__.__name__}'")
+            if kobj is STOP_CHAIN:
+                return STOP_CHAIN
+            if next_handlers is not None:
+                handlers = next_handlers
+                i = 0
             
-            resp = handler.handle(kobj.model_copy())
+        return kobj
             
-            # stops handler chain execution
-            if resp is STOP_CHAIN:
-                self.log.debug(f"Handler chain stopped by {handler.__class__.__name__}")
-                return STOP_CHAIN
+    async def call_handler_chain_async(
+        self, 
+        handler_type: HandlerType,
+        kobj: KnowledgeObject
+    ) -> KnowledgeObject | StopChain:
+        """Calls handlers of provided type, like `call_handler_chain`.
             
-            # kobj unmodified
-            elif resp is None:
-                continue
+        Chains without async handlers or enforced time budgets are run on
+        the sync handler thread pool in one call. Otherwise handlers are
+        called one by one, async handlers are awaited on the event loop.
+        """
+        
+        handlers = self.get_handler_chain(
+            handler_type, type(kobj.rid), kobj.event_type)
+        
+        if not handlers:
+            return kobj
+        if not any(
+            isinstance(handler, AsyncKnowledgeHandler) or self.enforces_budget(handler)
+            for handler in handlers
+        ):
+            return await self.run_sync(self.call_handler_chain, handler_type, kobj)
+        
+        with self.pipeline_metrics.time_stage(handler_type, type(kobj.rid)):
+            i = 0
+            while i < len(handlers):
+                handler = handlers[i]
+                i += 1
+                
+                resp = await self.call_handler_async(handler_type, handler, kobj)
+                kobj, next_handlers = self.handle_response(handler_type, handler, kobj, resp)
+                
+                if kobj is STOP_CHAIN:
+                    return STOP_CHAIN
+                if next_handlers is not None:
+                    handlers = next_handlers
+                    i = 0
+                
+            return kobj
             
-            # kobj modified by handler
-            elif isinstance(resp, KnowledgeObject):
-                kobj = resp
-                self.log.debug(f"Knowledge object modified by {handler.__class__.__name__}")
+    def call_handler(
+        self,
+        handler_type: HandlerType,
+        handler: KnowledgeHandler,
+        kobj: KnowledgeObject
+    ) -> KnowledgeObject | None | StopChain:
+        """Calls a handler, async handlers are run to completion.
+        
+        Handlers with an enforced time budget are run on their own 
+        thread pool, and skipped if they don't return within the budget.
+        """
+        self.log.debug(f"Calling {handler_type} handler '{handler.__class__.__name__}'")
+        
+        budget = self.time_budget(handler)
+        call = HandlerCall()
             
+        with self.pipeline_metrics.time_handler(handler.__class__.__name__, type(kobj.rid)):
+            if not self.enforces_budget(handler):
+                resp = self.run_handler(handler, kobj, call)
+        
             else:
-                raise ValueError(f"Handler {handler.__class__.__name__} returned invalid response '{resp}'")
+                future = self.budget_executor(handler).submit(
+                    self.run_handler, handler, kobj, call)
+                
+                # time queued behind earlier calls doesn't count towards the budget
+                if not call.started.wait(budget) and future.cancel():
+                    return self.not_started(handler, kobj, budget)
+                call.started.wait()
+                
+                try:
+                    resp = future.result(timeout=call.remaining(budget))
+                except FutureTimeoutError:
+                    self.exceeded_budget(handler, kobj, budget)
+                    return None
+        
+        if budget is not None and call.duration > budget:
+            self.exceeded_budget(handler, kobj, budget)
+        return resp
+    
+    def run_handler(
+        self,
+        handler: KnowledgeHandler,
+        kobj: KnowledgeObject,
+        call: HandlerCall
+    ) -> KnowledgeObject | None | StopChain:
+        call.begin()
+        # read only handlers don't mutate the knowledge object, so it isn't copied
+        resp = handler.handle(kobj if handler.read_only else kobj.model_copy())
+        if isinstance(handler, AsyncKnowledgeHandler):
+            resp = asyncio.run(resp)
+        call.end()
+        return resp
+    
+    async def call_handler_async(
+        self,
+        handler_type: HandlerType,
+        handler: KnowledgeHandler,
+        kobj: KnowledgeObject
+    ) -> KnowledgeObject | None | StopChain:
+        """Calls a handler, sync handlers are run on the thread pool.
+        
+        Sync handlers with an enforced time budget are run on their own
+        thread pool. Handlers with an enforced time budget are skipped 
+        if they don't return within the budget.
+        """
+        self.log.debug(f"Calling {handler_type} handler '{handler.__class__.__name__}'")
+        
+        budget = self.time_budget(handler)
+        enforced = self.enforces_budget(handler)
+        
+        with self.pipeline_metrics.time_handler(handler.__class__.__name__, type(kobj.rid)):
+            if isinstance(handler, AsyncKnowledgeHandler):
+                call = HandlerCall()
+                call.begin()
+                # read only handlers don't mutate the knowledge object, so it isn't copied
+                coro = handler.handle(kobj if handler.read_only else kobj.model_copy())
+                try:
+                    resp = await asyncio.wait_for(coro, budget if enforced else None)
+                except asyncio.TimeoutError:
+                    self.exceeded_budget(handler, kobj, budget)
+                    return None
+                call.end()
             
-        return kobj
+            elif not enforced:
+                call = HandlerCall()
+                resp = await self.run_sync(self.run_handler, handler, kobj, call)
+            
+            else:
+                loop = asyncio.get_running_loop()
+                started = loop.create_future()
+                call = HandlerCall(on_start=lambda: loop.call_soon_threadsafe(
+                    lambda: started.done() or started.set_result(None)))
+                future = self.budget_executor(handler).submit(
+                    self.run_handler, handler, kobj, call)
+            
+                # time queued behind earlier calls doesn't count towards the budget
+                try:
+                    await asyncio.wait_for(asyncio.shield(started), budget)
+                except asyncio.TimeoutError:
+                    if future.cancel():
+                        return self.not_started(handler, kobj, budget)
+                    call.started.wait()
+        
+                try:
+                    resp = await asyncio.wait_for(
+                        asyncio.wrap_future(future), call.remaining(budget))
+                except asyncio.TimeoutError:
+                    self.exceeded_budget(handler, kobj, budget)
+                    return None
+        
+        if budget is not None and call.duration > budget:
+            self.exceeded_budget(handler, kobj, budget)
+        return resp
+    
+    def budget_executor(self, handler: KnowledgeHandler) -> ThreadPoolExecutor:
+        """Returns thread pool of a handler with an enforced time budget.
+        
+        Each handler has its own pool, so a handler which doesn't return
+        can't delay calls to other handlers.
+        """
+        name = handler.__class__.__name__
+        with self._lock:
+            executor = self.budget_executors.get(name)
+            if executor is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=self.config.koi_net.pipeline.sync_handler_threads,
+                    thread_name_prefix=f"budget_{name}"
+                )
+                self.budget_executors[name] = executor
+        return executor
+    
+    def not_started(
+        self,
+        handler: KnowledgeHandler,
+        kobj: KnowledgeObject,
+        budget: float
+    ) -> None:
+        """Skips call queued behind earlier calls for longer than its budget.
+        
+        Not counted as a violation, the handler never ran.
+        """
+        self.log.warning(f"Handler '{handler.__class__.__name__}' didn't start within time budget of {budget}s for {kobj!r}, skipping")
+        return None
+    
+    def time_budget(self, handler: KnowledgeHandler) -> float | None:
+        """Returns time budget of handler in seconds, `None` if unlimited."""
+        pipeline_config = self.config.koi_net.pipeline
+        budget = pipeline_config.handler_time_budgets.get(handler.__class__.__name__)
+        if budget is None:
+            budget = handler.time_budget
+        if budget is None:
+            budget = pipeline_config.default_handler_time_budget
+        return budget
+    
+    def enforces_budget(self, handler: KnowledgeHandler) -> bool:
+        """Returns whether handler is skipped when exceeding its time budget."""
+        return self.budgets_enforced and self.time_budget(handler) is not None
+    
+    def exceeded_budget(
+        self,
+        handler: KnowledgeHandler,
+        kobj: KnowledgeObject,
+        budget: float
+    ):
+        """Records handler exceeding its time budget, and takes the 
+        configured action."""
+        
+        name = handler.__class__.__name__
+        pipeline_config = self.config.koi_net.pipeline
+        self.pipeline_metrics.record_violation(name, type(kobj.rid))
+        
+        if pipeline_config.handler_budget_action == HandlerBudgetAction.LOG:
+            self.log.warning(f"Handler '{name}' exceeded time budget of {budget}s for {kobj!r}")
+            return
+        
+        self.log.warning(f"Handler '{name}' exceeded time budget of {budget}s for {kobj!r}, skipping")
+        if pipeline_config.handler_budget_action != HandlerBudgetAction.DISABLE:
+            return
+        
+        with self._lock:
+            violations = self.budget_violations.get(name, 0) + 1
+            self.budget_violations[name] = violations
+            if violations < pipeline_config.disable_after_violations or name in self.disabled_handlers:
+                return
+            self.disabled_handlers.add(name)
+            self.build_dispatch_table()
+        
+        self.log.error(f"Disabled handler '{name}' after {violations} time budget violation(s)")
+    
+    def enable_handler(self, name: str):
+        """Re-enables a handler disabled for exceeding its time budget."""
+        with self._lock:
+            self.disabled_handlers.discard(name)
+            self.budget_violations.pop(name, None)
+            self.build_dispatch_table()
+        self.log.info(f"Enabled handler '{name}'")
+    
+    def handle_response(
+        self,
+        handler_type: HandlerType,
+        handler: KnowledgeHandler,
+        kobj: KnowledgeObject,
+        resp: KnowledgeObject | None | StopChain
+    ) -> tuple[KnowledgeObject | StopChain, tuple[KnowledgeHandler, ...] | None]:
+        """Returns knowledge object after a handler's response.
+        
+        Also returns the remaining handlers to call, if the response 
+        changed the RID or event type, otherwise `None`.
+        """
+        
+        # stops handler chain execution
+        if resp is STOP_CHAIN:
+            self.log.debug(f"Handler chain stopped by {handler.__class__.__name__}")
+            return STOP_CHAIN, None
+        
+        # kobj unmodified
+        elif resp is None:
+            return kobj, None
+        
+        # kobj modified by handler
+        elif isinstance(resp, KnowledgeObject):
+            handlers = None
+            if (type(resp.rid), resp.event_type) != (type(kobj.rid), kobj.event_type):
+                # remaining handlers registered after this one, matching the new types
+                position = next(
+                    j for j, other in enumerate(self.knowledge_handlers)
+                    if other is handler
+                )
+                handlers = self.filter_handlers(
+                    handler_type,
+                    type(resp.rid),
+                    resp.event_type,
+                    self.knowledge_handlers[position + 1:]
+                )
+            
+            self.log.debug(f"Knowledge object modified by {handler.__class__.__name__}")
+            return resp, handlers
+        
+        else:
+            raise ValueError(f"Handler {handler.__class__.__name__} returned invalid response '{resp}'")
+    
+    async def run_sync(self, func, *args):
+        """Runs blocking function on the sync handler thread pool."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
     
     def process(self, kobj: KnowledgeObject):
         """Sends knowledge object through knowledge processing pipeline.
@@ -112,94 +528,451 @@ class KnowledgePipeline:
         handler chains will not be called.
         """
         
-        self.log.debug(f"Handling {kobj!r}")
-        kobj = self.call_handler_chain(HandlerType.RID, kobj)
-        if kobj is STOP_CHAIN: return
+        self.process_batch([kobj])
         
-        if kobj.event_type == EventType.FORGET:
-            bundle = self.cache.read(kobj.rid)
-            if not bundle:
-                self.log.debug("Local bundle not found")
-                return
+    def process_batch(self, kobjs: list[KnowledgeObject]):
+        """Sends knowledge objects through knowledge processing pipeline.
             
-            # the bundle (to be deleted) attached to kobj for downstream analysis
-            self.log.debug("Adding local bundle (to be deleted) to knowledge object")
-            kobj.manifest = bundle.manifest
-            kobj.contents = bundle.contents
+        Each knowledge object passes through the same stages as in 
+        `process`, but missing manifests and bundles are fetched with a 
+        single request to each source. RID, Manifest, and Bundle handler 
+        chains are called for the whole batch in turn. Cache writes are 
+        then made together with `write_many`, and cache deletes and 
+        network graph updates applied in batch order, before later 
+        stages are run for each knowledge object in order.
             
-        else:
-            # attempt to retrieve manifest
-            if not kobj.manifest:
-                self.log.debug("Manifest not found")
-                if not kobj.source:
-                    return
+        The batch is split before any RID repeated in it, so handlers 
+        always see the cache state left by earlier knowledge about the 
+        same RID. It is also split before knowledge depending on a node 
+        earlier in the batch: knowledge from that node, or an edge 
+        connecting it. Ordering across other RIDs is relaxed: 
+        knowledge about one RID may not see the effects of earlier 
+        knowledge about another before its Network stage.
+        """
             
-                self.log.debug("Attempting to fetch remote manifest from source")
-                try:
-                    payload = self.request_handler.fetch_manifests(
-                        node=kobj.source,
-                        rids=[kobj.rid])
-                except RequestError:
-                    self.log.debug("Failed to find manifest")
-                    return
+        for batch in self.split_batch(kobjs):
+            self.process_unique_batch(batch)
+    
+    async def process_batch_async(self, kobjs: list[KnowledgeObject]):
+        """Sends knowledge objects through the pipeline on the event loop.
+        
+        Like `process_batch`, but each stage runs concurrently for the 
+        whole batch: handler chains of different knowledge objects, and
+        requests to different sources, are in flight at the same time.
+        Cache writes and network graph updates are applied in batch
+        order, after all Bundle handler chains and before any Network
+        handler chain.
+        """
+        
+        for batch in self.split_batch(kobjs):
+            await self.process_unique_batch_async(batch)
+    
+    @staticmethod
+    def ordering_dependencies(kobj: KnowledgeObject) -> set[RID] | None:
+        """Returns nodes a knowledge object depends on, `None` if unknown.
+        
+        Knowledge depends on its source node, and edges also on the 
+        nodes they connect. Endpoints of edges without contents are 
+        unknown until fetched.
+        """
+        dependencies = {kobj.source} if kobj.source else set()
+        if type(kobj.rid) is KoiNetEdge:
+            if not kobj.contents:
+                return None
+            try:
+                edge_profile = EdgeProfile.model_validate(kobj.contents)
+            except ValidationError:
+                return None
+            dependencies.update((edge_profile.source, edge_profile.target))
+        return dependencies
+    
+    @classmethod
+    def split_batch(cls, kobjs: list[KnowledgeObject]) -> list[list[KnowledgeObject]]:
+        """Splits batch into batches of distinct RIDs.
+        
+        Splits before any repeated RID, and before knowledge depending 
+        on a node already in the batch.
+        """
+        batches = []
+        start = 0
+        batch_rids = set()
+        batch_nodes = set()
+        for i, kobj in enumerate(kobjs):
+            depends = False
+            if batch_nodes:
+                dependencies = cls.ordering_dependencies(kobj)
+                depends = dependencies is None or not batch_nodes.isdisjoint(dependencies)
+            
+            if kobj.rid in batch_rids or depends:
+                batches.append(kobjs[start:i])
+                start = i
+                batch_rids.clear()
+                batch_nodes.clear()
+            batch_rids.add(kobj.rid)
+            if type(kobj.rid) is KoiNetNode:
+                batch_nodes.add(kobj.rid)
                 
-                kobj.manifest = payload.manifests[0]
+        batches.append(kobjs[start:])
+        return batches
                 
-            kobj = self.call_handler_chain(HandlerType.Manifest, kobj)
-            if kobj is STOP_CHAIN: return
+    @staticmethod
+    def group_by_source(
+        kobjs: list[KnowledgeObject]
+    ) -> dict[KoiNetNode, list[KnowledgeObject]]:
+        groups: dict[KoiNetNode, list[KnowledgeObject]] = {}
+        for kobj in kobjs:
+            groups.setdefault(kobj.source, []).append(kobj)
+        return groups
             
-            # attempt to retrieve bundle
-            if not kobj.contents:
-                self.log.debug("Bundle not found")
-                if kobj.source is None:
-                    return
-                
-                self.log.debug("Attempting to fetch remote bundle from source")
-                try:
-                    payload = self.request_handler.fetch_bundles(
-                        node=kobj.source,
-                        rids=[kobj.rid]
-                    )
-                except RequestError:
-                    self.log.debug("Failed to find bundle")
-                    return
+    def manifests_to_fetch(
+        self, 
+        kobjs: list[KnowledgeObject]
+    ) -> tuple[dict[KoiNetNode, list[KnowledgeObject]], set[int]]:
+        """Groups knowledge objects missing a manifest by source.
                 
-                bundle = payload.bundles[0]
+        Also returns ids of knowledge objects without a source, which
+        are dropped.
+        """
                 
-                if kobj.manifest != bundle.manifest:
-                    self.log.warning("Retrieved bundle contains a different manifest")
+        missing = []
+        dropped = set()
+        for kobj in kobjs:
+            if kobj.event_type == EventType.FORGET or kobj.manifest:
+                continue
+            
+            self.log.debug("Manifest not found")
+            if not kobj.source:
+                dropped.add(id(kobj))
+            else:
+                missing.append(kobj)
+        
+        return self.group_by_source(missing), dropped
+    
+    def attach_manifests(
+        self,
+        group: list[KnowledgeObject],
+        payload: ManifestsPayload | None,
+        dropped: set[int]
+    ):
+        """Adds fetched manifests to knowledge objects, drops the rest."""
+        if payload is None:
+            self.log.debug("Failed to find manifest(s)")
+            dropped.update(id(kobj) for kobj in group)
+            return
+        
+        manifests = {manifest.rid: manifest for manifest in payload.manifests}
+        for kobj in group:
+            manifest = manifests.get(kobj.rid)
+            if manifest is None:
+                self.log.debug(f"Failed to find manifest for {kobj.rid!r}")
+                dropped.add(id(kobj))
+            else:
+                kobj.manifest = manifest
+    
+    def fetch_missing_manifests(
+        self, 
+        kobjs: list[KnowledgeObject]
+    ) -> list[KnowledgeObject]:
+        """Fetches manifests missing from knowledge objects.
+        
+        Returns knowledge objects with a manifest, in order. Knowledge 
+        objects without a source, or whose manifest couldn't be fetched, 
+        are dropped.
+        """
+        
+        groups, dropped = self.manifests_to_fetch(kobjs)
+        for source, group in groups.items():
+            self.log.debug(f"Attempting to fetch {len(group)} remote manifest(s) from source")
+            payload = self.fetch_group(self.request_handler.fetch_manifests, source, group)
+            self.attach_manifests(group, payload, dropped)
+        
+        return [kobj for kobj in kobjs if id(kobj) not in dropped]
+    
+    async def fetch_missing_manifests_async(
+        self, 
+        kobjs: list[KnowledgeObject]
+    ) -> list[KnowledgeObject]:
+        """Fetches manifests missing from knowledge objects, like 
+        `fetch_missing_manifests`, with concurrent requests to sources."""
+        
+        groups, dropped = self.manifests_to_fetch(kobjs)
+        payloads = await asyncio.gather(*(
+            self.fetch_group_async(self.request_handler.fetch_manifests_async, source, group)
+            for source, group in groups.items()
+        ))
+        for group, payload in zip(groups.values(), payloads):
+            self.attach_manifests(group, payload, dropped)
+        
+        return [kobj for kobj in kobjs if id(kobj) not in dropped]
+    
+    def bundles_to_fetch(
+        self, 
+        kobjs: list[KnowledgeObject]
+    ) -> tuple[dict[KoiNetNode, list[KnowledgeObject]], set[int]]:
+        """Groups knowledge objects missing contents by source.
+        
+        Also returns ids of knowledge objects without a source, which
+        are dropped.
+        """
+        
+        missing = []
+        dropped = set()
+        for kobj in kobjs:
+            if kobj.event_type == EventType.FORGET or kobj.contents:
+                continue
+            
+            self.log.debug("Bundle not found")
+            if kobj.source is None:
+                dropped.add(id(kobj))
+            else:
+                missing.append(kobj)
+        
+        return self.group_by_source(missing), dropped
+    
+    def attach_bundles(
+        self,
+        group: list[KnowledgeObject],
+        payload: BundlesPayload | None,
+        dropped: set[int]
+    ):
+        """Adds fetched bundles to knowledge objects, drops the rest."""
+        if payload is None:
+            self.log.debug("Failed to find bundle(s)")
+            dropped.update(id(kobj) for kobj in group)
+            return
+        
+        bundles = {bundle.rid: bundle for bundle in payload.bundles}
+        for kobj in group:
+            bundle = bundles.get(kobj.rid)
+            if bundle is None:
+                self.log.debug(f"Failed to find bundle for {kobj.rid!r}")
+                dropped.add(id(kobj))
+                continue
+            
+            if kobj.manifest != bundle.manifest:
+                self.log.warning("Retrieved bundle contains a different manifest")
                 
-                kobj.manifest = bundle.manifest
-                kobj.contents = bundle.contents
+            kobj.manifest = bundle.manifest
+            kobj.contents = bundle.contents
                 
-        kobj = self.call_handler_chain(HandlerType.Bundle, kobj)
-        if kobj is STOP_CHAIN: return
+    def fetch_missing_bundles(
+        self, 
+        kobjs: list[KnowledgeObject]
+    ) -> list[KnowledgeObject]:
+        """Fetches bundles missing from knowledge objects.
+        
+        Returns knowledge objects with contents, in order. Knowledge 
+        objects without a source, or whose bundle couldn't be fetched, 
+        are dropped.
+        """
+        
+        groups, dropped = self.bundles_to_fetch(kobjs)
+        for source, group in groups.items():
+            self.log.debug(f"Attempting to fetch {len(group)} remote bundle(s) from source")
+            payload = self.fetch_group(self.request_handler.fetch_bundles, source, group)
+            self.attach_bundles(group, payload, dropped)
+        
+        return [kobj for kobj in kobjs if id(kobj) not in dropped]
+    
+    async def fetch_missing_bundles_async(
+        self, 
+        kobjs: list[KnowledgeObject]
+    ) -> list[KnowledgeObject]:
+        """Fetches bundles missing from knowledge objects, like 
+        `fetch_missing_bundles`, with concurrent requests to sources."""
+        
+        groups, dropped = self.bundles_to_fetch(kobjs)
+        payloads = await asyncio.gather(*(
+            self.fetch_group_async(self.request_handler.fetch_bundles_async, source, group)
+            for source, group in groups.items()
+        ))
+        for group, payload in zip(groups.values(), payloads):
+            self.attach_bundles(group, payload, dropped)
+        
+        return [kobj for kobj in kobjs if id(kobj) not in dropped]
+    
+    def fetch_group(
+        self,
+        fetch: Callable[..., ManifestsPayload | BundlesPayload],
+        source: KoiNetNode,
+        group: list[KnowledgeObject]
+    ) -> ManifestsPayload | BundlesPayload | None:
+        """Fetches RIDs of knowledge objects from source, `None` if failed."""
+        try:
+            with self.pipeline_metrics.time_stage(
+                PipelineStage.FETCH, *{type(kobj.rid) for kobj in group}
+            ):
+                return fetch(node=source, rids=[kobj.rid for kobj in group])
+        except RequestError:
+            return None
+    
+    async def fetch_group_async(
+        self,
+        fetch: Callable[..., Awaitable[ManifestsPayload | BundlesPayload]],
+        source: KoiNetNode,
+        group: list[KnowledgeObject]
+    ) -> ManifestsPayload | BundlesPayload | None:
+        """Fetches RIDs of knowledge objects from source, `None` if failed."""
+        self.log.debug(f"Attempting to fetch {len(group)} remote object(s) from source")
+        try:
+            with self.pipeline_metrics.time_stage(
+                PipelineStage.FETCH, *{type(kobj.rid) for kobj in group}
+            ):
+                return await fetch(node=source, rids=[kobj.rid for kobj in group])
+        except RequestError:
+            return None
+    
+    def process_unique_batch(self, kobjs: list[KnowledgeObject]):
+        """Processes batch of knowledge objects with distinct RIDs."""
+        
+        prepared = []
+        for kobj in kobjs:
+            self.log.debug(f"Handling {kobj!r}")
+            kobj = self.call_handler_chain(HandlerType.RID, kobj)
+            if kobj is STOP_CHAIN: continue
             
-        if kobj.normalized_event_type in (EventType.UPDATE, EventType.NEW):
-            self.log.info(f"Writing to cache: {kobj!r}")
-            self.cache.write(kobj.bundle)
+            kobj = self.attach_local_bundle(kobj)
+            if kobj is not None: prepared.append(kobj)
+        
+        # attempt to retrieve manifests
+        kobjs = []
+        for kobj in self.fetch_missing_manifests(prepared):
+            if kobj.event_type != EventType.FORGET:
+                kobj = self.call_handler_chain(HandlerType.Manifest, kobj)
+                if kobj is STOP_CHAIN: continue
+            kobjs.append(kobj)
+        
+        # attempt to retrieve bundles
+        fetched = []
+        for kobj in self.fetch_missing_bundles(kobjs):
+            kobj = self.call_handler_chain(HandlerType.Bundle, kobj)
+            if kobj is STOP_CHAIN: continue
+            fetched.append(kobj)
+        
+        for kobj in self.apply_knowledge(fetched):
+            kobj = self.call_handler_chain(HandlerType.Network, kobj)
+            if kobj is STOP_CHAIN: continue
             
-        elif kobj.normalized_event_type == EventType.FORGET:
-            self.log.info(f"Deleting from cache: {kobj!r}")
-            self.cache.delete(kobj.rid)
+            self.push_events(kobj)
             
-        else:
-            self.log.debug("Normalized event type was not set, no cache or network operations will occur")
-            return
+            kobj = self.call_handler_chain(HandlerType.Final, kobj)
+    
+    async def process_unique_batch_async(self, kobjs: list[KnowledgeObject]):
+        """Processes batch of knowledge objects with distinct RIDs on the event loop."""
         
-        if type(kobj.rid) in (KoiNetNode, KoiNetEdge):
-            self.log.debug("Change to node or edge, regenerating network graph")
-            self.graph.generate()
+        for kobj in kobjs:
+            self.log.debug(f"Handling {kobj!r}")
+        kobjs = await self.call_handler_chains_async(HandlerType.RID, kobjs)
+        prepared = [
+            kobj for kobj in map(self.attach_local_bundle, kobjs)
+            if kobj is not None
+        ]
         
-        kobj = self.call_handler_chain(HandlerType.Network, kobj)
-        if kobj is STOP_CHAIN: return
+        # attempt to retrieve manifests
+        kobjs = await self.fetch_missing_manifests_async(prepared)
+        forgotten = {id(kobj) for kobj in kobjs if kobj.event_type == EventType.FORGET}
+        kobjs = await self.call_handler_chains_async(
+            HandlerType.Manifest, kobjs, skip=forgotten)
         
-        if kobj.network_targets:
-            self.log.debug(f"Broadcasting event to {len(kobj.network_targets)} network target(s)")
-        else:
-            self.log.debug("No network targets set")
+        # attempt to retrieve bundles
+        kobjs = await self.fetch_missing_bundles_async(kobjs)
+        kobjs = await self.call_handler_chains_async(HandlerType.Bundle, kobjs)
+        kobjs = self.apply_knowledge(kobjs)
+        
+        kobjs = await self.call_handler_chains_async(HandlerType.Network, kobjs)
+        for kobj in kobjs:
+            self.push_events(kobj)
         
-        for node in kobj.network_targets:
-            self.event_queue.push(kobj.normalized_event, node)
+        await self.call_handler_chains_async(HandlerType.Final, kobjs)
+    
+    async def call_handler_chains_async(
+        self,
+        handler_type: HandlerType,
+        kobjs: list[KnowledgeObject],
+        skip: set[int] = frozenset()
+    ) -> list[KnowledgeObject]:
+        """Calls handler chain for each knowledge object concurrently.
+        
+        Returns resulting knowledge objects in order, without those 
+        stopped by a handler. Knowledge objects with ids in `skip` are
+        passed through without calling handlers.
+        """
+        
+        async def call(kobj: KnowledgeObject):
+            if id(kobj) in skip:
+                return kobj
+            return await self.call_handler_chain_async(handler_type, kobj)
+        
+        results = await asyncio.gather(*(call(kobj) for kobj in kobjs))
+        return [kobj for kobj in results if kobj is not STOP_CHAIN]
+    
+    def attach_local_bundle(self, kobj: KnowledgeObject) -> KnowledgeObject | None:
+        """Adds local bundle to knowledge objects with `FORGET` events.
+        
+        Returns `None` if there is no local bundle to forget.
+        """
+        
+        if kobj.event_type == EventType.FORGET:
+            # contents are passed on to handlers, which may mutate them
+            bundle = self.cache.read(kobj.rid, copy=True)
+            if not bundle:
+                self.log.debug("Local bundle not found")
+                return None
+            
+            # the bundle (to be deleted) attached to kobj for downstream analysis
+            self.log.debug("Adding local bundle (to be deleted) to knowledge object")
+            kobj.manifest = bundle.manifest
+            kobj.contents = bundle.contents
+        
+        return kobj
+    
+    def apply_knowledge(self, kobjs: list[KnowledgeObject]) -> list[KnowledgeObject]:
+        """Writes to or deletes from cache, and updates the network graph.
+        
+        Bundles are written with a single `write_many`, then deletes and 
+        graph updates are applied in order. Returns knowledge objects 
+        whose normalized event type was set.
+        """
+            
+        applied = []
+        for kobj in kobjs:
+            if kobj.normalized_event_type in (EventType.UPDATE, EventType.NEW):
+                self.log.info(f"Writing to cache: {kobj!r}")
+            elif kobj.normalized_event_type == EventType.FORGET:
+                self.log.info(f"Deleting from cache: {kobj!r}")
+            else:
+                self.log.debug("Normalized event type was not set, no cache or network operations will occur")
+                continue
+            applied.append(kobj)
+            
+        writes = [kobj for kobj in applied if kobj.normalized_event_type != EventType.FORGET]
+        if writes:
+            with self.pipeline_metrics.time_stage(
+                PipelineStage.CACHE_WRITE, *{type(kobj.rid) for kobj in writes}
+            ):
+                self.cache.write_many([kobj.bundle for kobj in writes])
+            
+        for kobj in applied:
+            if kobj.normalized_event_type == EventType.FORGET:
+                with self.pipeline_metrics.time_stage(PipelineStage.CACHE_DELETE, type(kobj.rid)):
+                    self.cache.delete(kobj.rid)
+        
+            if type(kobj.rid) in ORDERED_RID_TYPES:
+                self.log.debug("Change to node or edge, updating network graph")
+                with self.pipeline_metrics.time_stage(PipelineStage.GRAPH_UPDATE, type(kobj.rid)):
+                    self.graph.apply(kobj)
+        
+        return applied
+    
+    def push_events(self, kobj: KnowledgeObject):
+        """Queues normalized event for each of the network targets."""
+        
+        if not kobj.network_targets:
+            self.log.debug("No network targets set")
+            return
         
-        kobj = self.call_handler_chain(HandlerType.Final, kobj)
+        self.log.debug(f"Broadcasting event to {len(kobj.network_targets)} network target(s)")
+        with self.pipeline_metrics.time_stage(PipelineStage.PUSH_EVENTS, type(kobj.rid)):
+            for node in kobj.network_targets:
+                self.event_queue.push(kobj.normalized_event, node)
+        
\ No newline at end of file
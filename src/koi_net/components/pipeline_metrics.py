@@ -0,0 +1,171 @@
+import time
+import threading
+from bisect import bisect_left
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from enum import StrEnum
+
+from rid_lib.core import RIDType
+
+from ..config.base import BaseNodeConfig
+
+# upper bounds of histogram buckets in seconds, from 1us doubling up to ~17s
+BUCKET_BOUNDS: tuple[float, ...] = tuple(1e-6 * 2 ** i for i in range(25))
+
+NULL_TIMER = nullcontext()
+
+
+class PipelineStage(StrEnum):
+    """Pipeline stages timed outside of handler chains.
+    
+    Handler chains are timed as stages named by their handler type.
+    """
+    
+    FETCH = "fetch"
+    CACHE_WRITE = "cache_write"
+    CACHE_DELETE = "cache_delete"
+    GRAPH_UPDATE = "graph_update"
+    PUSH_EVENTS = "push_events"
+
+
+@dataclass
+class Histogram:
+    """Distribution of durations, counted in exponential buckets."""
+    
+    counts: list[int] = field(default_factory=lambda: [0] * (len(BUCKET_BOUNDS) + 1))
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    
+    def observe(self, seconds: float):
+        self.counts[bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+    
+    def quantile(self, q: float) -> float:
+        """Returns upper bound of the bucket containing the quantile."""
+        rank = q * self.count
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return BUCKET_BOUNDS[bucket] if bucket < len(BUCKET_BOUNDS) else self.max
+        return 0.0
+    
+    def stats(self) -> dict[str, float]:
+        """Returns count, and durations in seconds."""
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99)
+        }
+
+@dataclass
+class Timer:
+    """Context manager adding its duration to histograms."""
+    
+    histograms: list[Histogram]
+    lock: threading.Lock
+    
+    start: float = field(init=False, default=0.0)
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc_info):
+        duration = time.perf_counter() - self.start
+        with self.lock:
+            for histogram in self.histograms:
+                histogram.observe(duration)
+
+
+@dataclass
+class PipelineMetrics:
+    """Timing histograms of knowledge pipeline stages and handlers.
+    
+    Durations are labeled by RID type of the knowledge object. Handlers
+    are labeled by class name. Timing is enabled by `timing_metrics` in
+    the pipeline config, or by setting `enabled` at runtime. When
+    disabled, timers are a shared no-op context manager.
+    
+    Handler time budget violations are always counted.
+    """
+    
+    config: BaseNodeConfig
+    
+    enabled: bool = field(init=False, default=False)
+    stages: dict[tuple[str, RIDType], Histogram] = field(init=False, default_factory=dict)
+    handlers: dict[tuple[str, RIDType], Histogram] = field(init=False, default_factory=dict)
+    budget_violations: dict[tuple[str, RIDType], int] = field(init=False, default_factory=dict)
+    _lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+    
+    def __post_init__(self):
+        self.enabled = self.config.koi_net.pipeline.timing_metrics
+    
+    def time_stage(self, stage: str, *rid_types: RIDType):
+        """Returns timer for a pipeline stage.
+        
+        Stages handling several knowledge objects at once, like fetches,
+        are recorded once for each of their RID types.
+        """
+        if not self.enabled:
+            return NULL_TIMER
+        return Timer([
+            self.histogram(self.stages, stage, rid_type)
+            for rid_type in rid_types
+        ], self._lock)
+    
+    def time_handler(self, handler_name: str, rid_type: RIDType):
+        """Returns timer for a knowledge handler call."""
+        if not self.enabled:
+            return NULL_TIMER
+        return Timer([self.histogram(self.handlers, handler_name, rid_type)], self._lock)
+    
+    def record_violation(self, handler_name: str, rid_type: RIDType):
+        """Counts a handler call exceeding its time budget."""
+        key = (handler_name, rid_type)
+        with self._lock:
+            self.budget_violations[key] = self.budget_violations.get(key, 0) + 1
+    
+    def histogram(
+        self,
+        histograms: dict[tuple[str, RIDType], Histogram],
+        name: str,
+        rid_type: RIDType
+    ) -> Histogram:
+        key = (name, rid_type)
+        histogram = histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = histograms.setdefault(key, Histogram())
+        return histogram
+    
+    def stats(self) -> dict[str, dict[str, dict[str, dict[str, float] | int]]]:
+        """Returns timing stats of stages and handlers, and budget 
+        violations of handlers, by name and RID type."""
+        stats = {"stages": {}, "handlers": {}, "budget_violations": {}}
+        with self._lock:
+            for kind, histograms in (
+                ("stages", self.stages),
+                ("handlers", self.handlers)
+            ):
+                for (name, rid_type), histogram in histograms.items():
+                    stats[kind].setdefault(name, {})[str(rid_type)] = histogram.stats()
+            
+            for (name, rid_type), count in self.budget_violations.items():
+                stats["budget_violations"].setdefault(name, {})[str(rid_type)] = count
+        return stats
+    
+    def reset(self):
+        """Clears all recorded durations."""
+        with self._lock:
+            self.stages.clear()
+            self.handlers.clear()
+            self.budget_violations.clear()
@@ -1,4 +1,7 @@
-from dataclasses import dataclass
+import asyncio
+import inspect
+import threading
+from dataclasses import dataclass, field
 from functools import wraps
 from logging import Logger
 
@@ -37,6 +40,7 @@ from ..exceptions import (
     RemoteInvalidKeyError,
     RemoteInvalidSignatureError,
     RemoteInvalidTargetError,
+    RemoteOverloadedError,
     RequestError,
     SelfRequestError,
     PartialNodeQueryError,
@@ -46,11 +50,17 @@ from ..exceptions import (
     RemoteUnknownNodeError
 )
 from .error_handler import ErrorHandler
+from ..infra import depends_on
 
 
 @dataclass
 class RequestHandler:
-    """Handles making requests to other KOI nodes."""
+    """Handles making requests to other KOI nodes.
+    
+    Async requests share one `httpx.AsyncClient` for each event loop,
+    reusing its connections. Clients are closed by the loop's owner
+    with `close_async_client`, or by `stop` if their loop is still open.
+    """
     
     log: Logger
     cache: Cache
@@ -58,6 +68,37 @@ class RequestHandler:
     secure_manager: SecureManager
     error_handler: ErrorHandler
     
+    async_clients: dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = field(init=False, default_factory=dict)
+    _clients_lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+    
+    @depends_on("kobj_worker")
+    def stop(self):
+        with self._clients_lock:
+            clients, self.async_clients = self.async_clients, {}
+        
+        for loop, client in clients.items():
+            if loop.is_closed() or loop.is_running():
+                self.log.warning("Can't close async client, its event loop is closed or running")
+                continue
+            loop.run_until_complete(client.aclose())
+    
+    def get_async_client(self) -> httpx.AsyncClient:
+        """Returns async client of the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._clients_lock:
+            client = self.async_clients.get(loop)
+            if client is None:
+                client = httpx.AsyncClient()
+                self.async_clients[loop] = client
+        return client
+    
+    async def close_async_client(self):
+        """Closes async client of the running event loop, if any."""
+        with self._clients_lock:
+            client = self.async_clients.pop(asyncio.get_running_loop(), None)
+        if client:
+            await client.aclose()
+    
     def get_base_url(self, node_rid: KoiNetNode) -> str:
         """Retrieves URL of a node from its RID."""
         
@@ -80,6 +121,16 @@ class RequestHandler:
     @staticmethod
     def report_exception(func):
         """Logs request errors as warnings."""
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(self: "RequestHandler", *args, **kwargs):
+                try:
+                    return await func(self, *args, **kwargs)
+                except RequestError as err:
+                    self.log.warning(err)
+                    raise
+            return async_wrapper
+        
         @wraps(func)
         def wrapper(self: "RequestHandler", *args, **kwargs):
             try:
@@ -89,14 +140,13 @@ class RequestHandler:
                 raise
         return wrapper
     
-    @report_exception
-    def make_request(
+    def prepare_request(
         self,
         node: KoiNetNode,
-        path: str, 
-        request: RequestModels,
-    ) -> ResponseModels | None:
-        """Makes a request to a node."""
+        path: str,
+        request: RequestModels
+    ) -> tuple[str, str]:
+        """Returns URL and signed envelope data for a request to a node."""
         if node == self.identity.rid:
             raise SelfRequestError("Don't talk to yourself")
         
@@ -108,7 +158,17 @@ class RequestHandler:
             target=node
         )
         
-        data = signed_envelope.model_dump_json(exclude_none=True)
+        return url, signed_envelope.model_dump_json(exclude_none=True)
+    
+    @report_exception
+    def make_request(
+        self,
+        node: KoiNetNode,
+        path: str, 
+        request: RequestModels,
+    ) -> ResponseModels | None:
+        """Makes a request to a node."""
+        url, data = self.prepare_request(node, path, request)
         
         try:
             result = httpx.post(
@@ -124,31 +184,74 @@ class RequestHandler:
             raise TransportError(e)
         
         except httpx.HTTPStatusError:
-            """Possible errors:
+            self.handle_error_response(node, result)
             
-            4xx - KOI-net protocol error, validate body
-            404/405 - not implementing endpoints, or misconfigured URL
+        return self.parse_response(path, result)
             
-            500 - internal server error
-            """
-            try:
-                resp = ErrorResponse.model_validate_json(result.text)
-                self.error_handler.handle_protocol_error(resp.error, node)
+    @report_exception
+    async def make_request_async(
+        self,
+        node: KoiNetNode,
+        path: str, 
+        request: RequestModels,
+    ) -> ResponseModels | None:
+        """Makes a request to a node, without blocking the event loop."""
+        url, data = self.prepare_request(node, path, request)
                 
-                match resp.error:
-                    case ErrorType.UnknownNode:
-                        raise RemoteUnknownNodeError(f"Peer couldn't resolve this node's RID")
-                    case ErrorType.InvalidKey:
-                        raise RemoteInvalidKeyError(f"Peer marked this node's public key as invalid")
-                    case ErrorType.InvalidSignature:
-                        raise RemoteInvalidSignatureError("Peer marked envelope signature as invalid")
-                    case ErrorType.InvalidTarget:
-                        raise RemoteInvalidTargetError("Envelope target is not the peer node")
+        try:
+            result = await self.get_async_client().post(
+                url=url, 
+                content=data, 
+                headers={"Content-Type": "application/json"})
+            result.raise_for_status()
+            self.error_handler.reset_timeout_counter(node)
+            
+        except httpx.RequestError as e:
+            self.log.debug("Failed to connect")
+            self.error_handler.handle_connection_error(node)
+            raise TransportError(e)
             
-            except ValidationError as e:
-                raise ServerError(e)
+        except httpx.HTTPStatusError:
+            # handling protocol errors may make blocking requests (handshakes)
+            await asyncio.to_thread(self.handle_error_response, node, result)
+        
+        return self.parse_response(path, result)
+    
+    def handle_error_response(self, node: KoiNetNode, result: httpx.Response):
+        """Handles error response from a node, raising the matching error.
+        
+        Possible errors:
+        
+        4xx - KOI-net protocol error, validate body
+        404/405 - not implementing endpoints, or misconfigured URL
+        
+        500 - internal server error
+        """
+        try:
+            resp = ErrorResponse.model_validate_json(result.text)
+            self.error_handler.handle_protocol_error(resp.error, node)
             
+            match resp.error:
+                case ErrorType.UnknownNode:
+                    raise RemoteUnknownNodeError(f"Peer couldn't resolve this node's RID")
+                case ErrorType.InvalidKey:
+                    raise RemoteInvalidKeyError(f"Peer marked this node's public key as invalid")
+                case ErrorType.InvalidSignature:
+                    raise RemoteInvalidSignatureError("Peer marked envelope signature as invalid")
+                case ErrorType.InvalidTarget:
+                    raise RemoteInvalidTargetError("Envelope target is not the peer node")
+                case ErrorType.Overloaded:
+                    raise RemoteOverloadedError("Peer is overloaded, retry later")
         
+        except ValidationError as e:
+            raise ServerError(e)
+    
+    def parse_response(
+        self, 
+        path: str, 
+        result: httpx.Response
+    ) -> ResponseModels | None:
+        """Validates response envelope from a node, returns its payload."""
         resp_env_model = API_MODEL_MAP[path].response_envelope
         if not resp_env_model:
             return
@@ -234,4 +337,34 @@ class RequestHandler:
         request = req or FetchBundles.model_validate(kwargs)
         resp = self.make_request(node, FETCH_BUNDLES_PATH, request)
         self.log.info(f"Fetched {len(resp.bundles)} bundle(s) from {node!r}")
+        return resp
+    
+    async def fetch_manifests_async(
+        self, 
+        node: RID, 
+        req: FetchManifests | None = None,
+        **kwargs
+    ) -> ManifestsPayload:
+        """Fetches manifests from a node, without blocking the event loop.
+        
+        Pass `FetchManifests` object as `req` or fields as kwargs.
+        """
+        request = req or FetchManifests.model_validate(kwargs)
+        resp = await self.make_request_async(node, FETCH_MANIFESTS_PATH, request)
+        self.log.info(f"Fetched {len(resp.manifests)} manifest(s) from {node!r}")
+        return resp
+    
+    async def fetch_bundles_async(
+        self, 
+        node: RID, 
+        req: FetchBundles | None = None,
+        **kwargs
+    ) -> BundlesPayload:
+        """Fetches bundles from a node, without blocking the event loop.
+        
+        Pass `FetchBundles` object as `req` or fields as kwargs.
+        """
+        request = req or FetchBundles.model_validate(kwargs)
+        resp = await self.make_request_async(node, FETCH_BUNDLES_PATH, request)
+        self.log.info(f"Fetched {len(resp.bundles)} bundle(s) from {node!r}")
         return resp
\ No newline at end of file
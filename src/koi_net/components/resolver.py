@@ -8,7 +8,7 @@ from rid_lib.types import KoiNetNode
 
 from .graph import NetworkGraph
 from .request_handler import RequestHandler
-from ..protocol.node import NodeProfile, NodeType
+from ..protocol.node import NodeType
 from ..protocol.event import Event
 from .identity import NodeIdentity
 from ..config.base import BaseNodeConfig
@@ -34,13 +34,10 @@ class NetworkResolver:
         
         self.log.debug(f"Looking for state providers of {rid_type}")
         provider_nodes = []
-        for node_rid in self.cache.list_rids(rid_types=[KoiNetNode]):
+        for node_rid, node_profile in self.graph.get_node_profiles().items():
             if node_rid == self.identity.rid:
                 continue
             
-            node_bundle = self.cache.read(node_rid)
-            node_profile = node_bundle.validate_contents(NodeProfile)
-            
             if node_profile.node_type != NodeType.FULL:
                 continue
             
@@ -113,11 +110,8 @@ class NetworkResolver:
         
         neighbors: list[KoiNetNode] = []
         for node_rid in self.graph.get_neighbors():
-            node_bundle = self.cache.read(node_rid)
-            if not node_bundle: 
-                continue
-            node_profile = node_bundle.validate_contents(NodeProfile)
-            if node_profile.node_type != NodeType.FULL: 
+            node_profile = self.graph.get_node_profile(node_rid)
+            if not node_profile or node_profile.node_type != NodeType.FULL: 
                 continue
             neighbors.append(node_rid)
             
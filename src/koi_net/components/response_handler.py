@@ -3,12 +3,14 @@ from logging import Logger
 
 from rid_lib import RID
 from rid_lib.types import KoiNetNode
-from rid_lib.ext import Manifest, Cache
+from rid_lib.ext import Manifest
 from rid_lib.ext.bundle import Bundle
 
+from .cache import Cache
 from .kobj_queue import KobjQueue
 from ..protocol.api.paths import BROADCAST_EVENTS_PATH, FETCH_BUNDLES_PATH, FETCH_MANIFESTS_PATH, FETCH_RIDS_PATH, POLL_EVENTS_PATH
 from ..protocol.envelope import SignedEnvelope
+from ..exceptions import OverloadedError
 from .secure_manager import SecureManager
 from ..protocol.api.models import (
     EventsPayload,
@@ -55,11 +57,22 @@ class ResponseHandler:
         )
         
     def broadcast_events_handler(self, req: EventsPayload, source: KoiNetNode):
+        """Queues received events, unless the knowledge object queue is full.
+        
+        Raises `OverloadedError` to refuse all events, the sender should 
+        keep them buffered and retry later.
+        """
+        if self.kobj_queue.is_full():
+            raise OverloadedError(f"Knowledge object queue is full, refusing {len(req.events)} event(s)")
+        
         self.log.info(f"Request to broadcast events, received {len(req.events)} event(s)")
         
         for event in req.events:
             self.kobj_queue.push(event=event, source=source)
         
+        # events are only acknowledged once journaled, by the next commit
+        self.kobj_queue.sync()
+    
     def poll_events_handler(
         self, 
         req: PollEvents, 
@@ -85,15 +98,11 @@ class ResponseHandler:
         source: KoiNetNode
     ) -> ManifestsPayload:
         """Returns response to fetch manifests request."""        
-        manifests: list[Manifest] = []
-        not_found: list[RID] = []
+        rids = req.rids or self.cache.list_rids(req.rid_types)
+        found = self.cache.read_manifests(rids)
         
-        for rid in (req.rids or self.cache.list_rids(req.rid_types)):
-            bundle = self.cache.read(rid)
-            if bundle:
-                manifests.append(bundle.manifest)
-            else:
-                not_found.append(rid)
+        manifests: list[Manifest] = list(found.values())
+        not_found: list[RID] = [rid for rid in rids if rid not in found]
         
         self.log.info(f"Request to fetch manifests, allowed types {req.rid_types}, rids {req.rids}, returning {len(manifests)} manifest(s)")
         return ManifestsPayload(manifests=manifests, not_found=not_found)
@@ -105,15 +114,10 @@ class ResponseHandler:
     ) -> BundlesPayload:
         """Returns response to fetch bundles request."""
         
-        bundles: list[Bundle] = []
-        not_found: list[RID] = []
-
-        for rid in req.rids:
-            bundle = self.cache.read(rid)
-            if bundle:
-                bundles.append(bundle)
-            else:
-                not_found.append(rid)
-                
+        found = self.cache.read_many(req.rids)
+        
+        bundles: list[Bundle] = list(found.values())
+        not_found: list[RID] = [rid for rid in req.rids if rid not in found]
+        
         self.log.info(f"Request to fetch bundles, requested rids {req.rids}, returning {len(bundles)} bundle(s)")
         return BundlesPayload(bundles=bundles, not_found=not_found)
\ No newline at end of file
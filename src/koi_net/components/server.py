@@ -3,13 +3,14 @@ from dataclasses import dataclass, field
 from typing import TYPE_CHECKING
 
 from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
 
 from ..infra import depends_on
 from .interfaces import ThreadedComponent
 from .response_handler import ResponseHandler
 from ..protocol.model_map import API_MODEL_MAP
 from ..protocol.api.models import ErrorResponse
-from ..protocol.errors import EXCEPTION_TO_ERROR_TYPE, ProtocolError
+from ..protocol.errors import EXCEPTION_TO_ERROR_TYPE, ERROR_TYPE_TO_STATUS_CODE, ProtocolError
 from ..config.full_node import FullNodeConfig
 
 if TYPE_CHECKING:
@@ -36,7 +37,9 @@ class NodeServer(ThreadedComponent):
         for path, models in API_MODEL_MAP.items():
             def create_endpoint(path: str):
                 async def endpoint(req):
-                    return self.response_handler.handle_response(path, req)
+                    # handlers block on disk, like waiting for the kobj journal
+                    return await run_in_threadpool(
+                        self.response_handler.handle_response, path, req)
                 
                 # programmatically setting type hint annotations for FastAPI's model validation 
                 endpoint.__annotations__ = {
@@ -85,7 +88,7 @@ class NodeServer(ThreadedComponent):
         resp = ErrorResponse(error=EXCEPTION_TO_ERROR_TYPE[type(exc)])
         self.log.info(f"Returning error response: {resp}")
         return JSONResponse(
-            status_code=400,
+            status_code=ERROR_TYPE_TO_STATUS_CODE.get(resp.error, 400),
             content=resp.model_dump(mode="json")
         )
     
@@ -1,16 +1,16 @@
 from dataclasses import dataclass
 from logging import Logger
 from rid_lib import RIDType
-from rid_lib.ext import Cache
 from rid_lib.types import KoiNetNode
 
 from ..config.base import BaseNodeConfig
 from ..infra import depends_on
 from ..exceptions import RequestError
+from .cache import Cache
 from .graph import NetworkGraph
 from .request_handler import RequestHandler
 from .kobj_queue import KobjQueue
-from ..protocol.node import NodeProfile, NodeType
+from ..protocol.node import NodeType
 
 
 @dataclass
@@ -47,11 +47,10 @@ class SyncManager:
         """Catches up with the state of RID types within other nodes."""
     
         for node in nodes:
-            node_bundle = self.cache.read(node)
-            node_profile = node_bundle.validate_contents(NodeProfile)
+            node_profile = self.graph.get_node_profile(node)
             
             # can't catch up with partial nodes
-            if node_profile.node_type != NodeType.FULL:
+            if not node_profile or node_profile.node_type != NodeType.FULL:
                 continue
             
             try:
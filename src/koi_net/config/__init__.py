@@ -5,6 +5,17 @@ from .koi_net_config import (
     KoiNetConfig,
     EventWorkerConfig,
     KobjWorkerConfig,
+    KobjLane,
+    CacheConfig,
+    CacheBackendType,
+    FsyncPolicy,
+    CacheEncoding,
+    CacheCompression,
+    CacheLayout,
+    CacheLimitConfig,
+    EvictionPolicy,
+    PipelineConfig,
+    HandlerBudgetAction,
     NodeContact
 )
 from .full_node import FullNodeConfig, FullNodeProfile
@@ -1,7 +1,8 @@
+from enum import StrEnum
 from pathlib import Path
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 from rid_lib import RIDType
-from rid_lib.types import KoiNetNode
+from rid_lib.types import KoiNetEdge, KoiNetNode
 
 from ..protocol import NodeProfile
 
@@ -10,9 +11,226 @@ class EventWorkerConfig(BaseModel):
     queue_timeout: float = 0.1
     max_buf_len: int = 5
     max_wait_time: float = 1.0
-    
+    # kobj workers wait while this many events are queued, `None` is unbounded
+    max_queue_size: int | None = None
+
+class FsyncPolicy(StrEnum):
+    NONE = "NONE"
+    PER_WRITE = "PER_WRITE"
+    GROUP_COMMIT = "GROUP_COMMIT"
+
+class KobjLane(StrEnum):
+    CONTROL = "CONTROL"
+    LOCAL = "LOCAL"
+    REMOTE = "REMOTE"
+
 class KobjWorkerConfig(BaseModel):
+    """Config for the knowledge processing worker.
+    
+    With more than one worker thread, knowledge objects are split 
+    between them by RID hash. Knowledge about the same RID is always 
+    processed in order, but knowledge about different RIDs may be 
+    processed in any order. Knowledge about `control_rid_types` is all 
+    processed by the first thread, so edges are processed after the 
+    nodes they connect.
+    
+    When `coalesce` is enabled, knowledge about an RID which is still 
+    waiting in the queue is replaced by newer knowledge about the same 
+    RID, so only the latest version is processed.
+    
+    Queued knowledge objects wait in one of three lanes: `CONTROL` for 
+    `control_rid_types`, `LOCAL` for other knowledge from this node, 
+    and `REMOTE` for other knowledge from the network. Lanes are served 
+    in proportion to their `lane_weights`, but knowledge objects waiting 
+    longer than `max_lane_wait` seconds are served first.
+    
+    If `max_queue_size` is set, once that many knowledge objects are 
+    queued, events broadcast by other nodes are refused until the queue 
+    drains. Knowledge from this node is always queued.
+    
+    If `journal_directory_path` is set, queued knowledge objects are 
+    also written to a journal in that directory, and replayed after a 
+    crash or restart. Journal writes follow `journal_fsync_policy`, like 
+    the cache's fsync policy, and segment files are compacted once they 
+    reach `journal_segment_size` bytes.
+    """
+    
     queue_timeout: float = 0.1
+    # max knowledge objects processed together, remote fetches are grouped by source
+    batch_size: int = 100
+    num_workers: int = 1
+    coalesce: bool = False
+    control_rid_types: list[RIDType] = [KoiNetNode, KoiNetEdge]
+    lane_weights: dict[KobjLane, int] = {
+        KobjLane.CONTROL: 8,
+        KobjLane.LOCAL: 4,
+        KobjLane.REMOTE: 1
+    }
+    max_lane_wait: float = 5.0
+    max_queue_size: int | None = None
+    journal_directory_path: Path | None = None
+    journal_fsync_policy: FsyncPolicy = FsyncPolicy.GROUP_COMMIT
+    journal_commit_interval: float = 0.05
+    journal_segment_size: int = 16 * 1024 * 1024
+    
+    @model_validator(mode="after")
+    def check_workers(self):
+        """Rejects worker pools without threads, and lanes which are never served."""
+        if self.num_workers < 1:
+            raise ValueError("Knowledge processing worker requires at least one thread")
+        for lane, weight in self.lane_weights.items():
+            if weight < 1:
+                raise ValueError(f"Weight of lane '{lane}' must be at least 1")
+        return self
+
+class CacheBackendType(StrEnum):
+    FILE = "FILE"
+    SQLITE = "SQLITE"
+
+class CacheEncoding(StrEnum):
+    JSON = "JSON"
+    COMPACT_JSON = "COMPACT_JSON"
+    MSGPACK = "MSGPACK"
+
+class CacheCompression(StrEnum):
+    NONE = "NONE"
+    ZLIB = "ZLIB"
+    LZMA = "LZMA"
+
+class CacheLayout(StrEnum):
+    FLAT = "FLAT"
+    SHARDED = "SHARDED"
+
+class EvictionPolicy(StrEnum):
+    LRU = "LRU"
+    TTL = "TTL"
+
+class CacheLimitConfig(BaseModel):
+    """Capacity limit for cached bundles of a single RID type.
+    
+    When `max_items` or `max_bytes` is exceeded, bundles are evicted 
+    least recently read first (`LRU`), or least recently written first
+    (`TTL`). With the `TTL` policy, bundles are also evicted `ttl` 
+    seconds after they were written.
+    """
+    
+    rid_type: RIDType
+    max_items: int | None = None
+    max_bytes: int | None = None
+    policy: EvictionPolicy = EvictionPolicy.LRU
+    ttl: float | None = None
+    
+    @model_validator(mode="after")
+    def check_limit(self):
+        """Rejects limits on node and edge RID types, and TTLs without a policy."""
+        if self.rid_type in (KoiNetNode, KoiNetEdge):
+            raise ValueError(f"Cache limit can't be set for '{self.rid_type}', nodes and edges are never evicted")
+        if self.policy == EvictionPolicy.TTL and self.ttl is None:
+            raise ValueError("Cache limit with TTL policy requires 'ttl' to be set")
+        return self
+
+class CacheConfig(BaseModel):
+    """Config for the RID cache.
+    
+    The `FILE` backend stores one JSON file per RID in the cache 
+    directory, the `SQLITE` backend stores all bundles in a single 
+    database file. When switching to the `SQLITE` backend, bundles in 
+    an existing cache directory are migrated into the (empty) database 
+    on startup.
+    
+    Recently read bundles are kept in memory, up to `lru_size` bundles
+    (set to 0 to disable).
+    
+    Writes are atomic, the fsync policy trades durability against write
+    throughput: `NONE` leaves flushing to the OS, `PER_WRITE` syncs 
+    before each write returns, and `GROUP_COMMIT` syncs all writes made
+    in the last `group_commit_interval` seconds together.
+    
+    Bundle files are stored with the set `encoding` (`MSGPACK` requires
+    the `msgpack` package), and compressed when their encoded size is 
+    at least `compression_threshold` bytes. Files are read in whatever 
+    format they were written in, so these settings can be changed on 
+    an existing cache (file names keep their `.json` suffix). 
+    `scripts/bench_cache_codec.py` compares file sizes and read and 
+    write times of each setting.
+    
+    The `SHARDED` layout spreads bundle files over `shard_depth` levels
+    of subdirectories, named by two hex digits of the RID's hash, so no
+    directory grows too large. Files are moved into the configured 
+    layout on startup when it changes.
+    
+    Capacity `limits` can be set per RID type, bundles over the limit 
+    are evicted within `eviction_interval` seconds. With 
+    `forget_on_evict`, evictions are processed as internal `FORGET` 
+    events through the knowledge pipeline (and broadcast like any 
+    other), instead of deleted directly. Bundles not deleted within 
+    `eviction_timeout` seconds, like when a handler stops the `FORGET`, 
+    count towards the limit again.
+    """
+    
+    backend: CacheBackendType = CacheBackendType.FILE
+    sqlite_path: Path = Path("rid_cache.db")
+    lru_size: int = 1024
+    fsync_policy: FsyncPolicy = FsyncPolicy.NONE
+    group_commit_interval: float = 0.1
+    encoding: CacheEncoding = CacheEncoding.COMPACT_JSON
+    compression: CacheCompression = CacheCompression.NONE
+    compression_threshold: int = 64 * 1024
+    layout: CacheLayout = CacheLayout.FLAT
+    shard_depth: int = 2
+    limits: list[CacheLimitConfig] = []
+    eviction_interval: float = 1.0
+    eviction_timeout: float = 60.0
+    forget_on_evict: bool = False
+
+class HandlerBudgetAction(StrEnum):
+    LOG = "LOG"
+    SKIP = "SKIP"
+    DISABLE = "DISABLE"
+
+class PipelineConfig(BaseModel):
+    """Config for the knowledge processing pipeline.
+    
+    With `timing_metrics`, durations of pipeline stages and handler 
+    calls are recorded by `PipelineMetrics`.
+    
+    With `use_async`, knowledge processing workers drive the pipeline on
+    an event loop: remote fetches for a batch are made concurrently, and
+    handler chains run concurrently across the batch. Async handlers are
+    awaited on the loop, sync handlers run on a pool of
+    `sync_handler_threads` threads.
+    
+    Handlers may be given a time budget in seconds, by class name in
+    `handler_time_budgets`, or by their `time_budget` attribute, falling
+    back to `default_handler_time_budget`. When a call exceeds its 
+    budget, the `LOG` action logs a warning. `SKIP` stops waiting for
+    the handler at the deadline, and continues the chain as if it 
+    returned `None`. `DISABLE` also skips, and disables the handler 
+    after `disable_after_violations` violations. Enforced budgets run 
+    sync handlers on the sync handler thread pool.
+    """
+    
+    timing_metrics: bool = False
+    use_async: bool = False
+    sync_handler_threads: int = 4
+    default_handler_time_budget: float | None = None
+    handler_time_budgets: dict[str, float] = {}
+    handler_budget_action: HandlerBudgetAction = HandlerBudgetAction.LOG
+    disable_after_violations: int = 3
+    
+    @model_validator(mode="after")
+    def check_threads(self):
+        """Rejects thread pools without threads, and invalid time budgets."""
+        if self.sync_handler_threads < 1:
+            raise ValueError("Sync handler thread pool requires at least one thread")
+        for name, budget in self.handler_time_budgets.items():
+            if budget <= 0:
+                raise ValueError(f"Time budget of handler '{name}' must be positive")
+        if self.default_handler_time_budget is not None and self.default_handler_time_budget <= 0:
+            raise ValueError("Default handler time budget must be positive")
+        if self.disable_after_violations < 1:
+            raise ValueError("Handlers can only be disabled after at least one violation")
+        return self
 
 class NodeContact(BaseModel):
     rid: KoiNetNode | None = None
@@ -26,11 +244,15 @@ class KoiNetConfig(BaseModel):
     node_profile: NodeProfile
     
     rid_types_of_interest: list[RIDType] = [KoiNetNode]
-        
+    
     cache_directory_path: Path = Path(".rid_cache")
     private_key_pem_path: Path = Path("priv_key.pem")
+    # set to `None` to disable graph snapshots
+    graph_snapshot_path: Path | None = Path(".graph_snapshot.json")
     
+    cache: CacheConfig = CacheConfig()
     event_worker: EventWorkerConfig = EventWorkerConfig()
     kobj_worker: KobjWorkerConfig = KobjWorkerConfig()
+    pipeline: PipelineConfig = PipelineConfig()
     
     first_contact: NodeContact = NodeContact()
\ No newline at end of file
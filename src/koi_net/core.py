@@ -9,6 +9,7 @@ from .config.full_node import FullNodeConfig
 from .config.partial_node import PartialNodeConfig
 from .components import (
     Cache,
+    CacheEvictor,
     Effector,
     Handshaker,
     SyncManager,
@@ -24,6 +25,7 @@ from .components import (
     ResponseHandler,
     EventBuffer,
     KnowledgePipeline,
+    PipelineMetrics,
     KobjQueue,
     SecureManager,
     ProfileMonitor,
@@ -49,6 +51,7 @@ class BaseNode(BaseAssembly):
     config_schema: BaseNodeConfig = BaseNodeConfig
     config: ConfigProvider | BaseNodeConfig = ConfigProvider
     cache: Cache = Cache
+    cache_evictor: CacheEvictor = CacheEvictor
     identity: NodeIdentity = NodeIdentity
     graph: NetworkGraph = NetworkGraph
     secure_manager: SecureManager = SecureManager
@@ -60,6 +63,7 @@ class BaseNode(BaseAssembly):
     resolver: NetworkResolver = NetworkResolver
     effector: Effector = Effector
     pipeline: KnowledgePipeline = KnowledgePipeline
+    pipeline_metrics: PipelineMetrics = PipelineMetrics
     kobj_worker: KnowledgeProcessingWorker = KnowledgeProcessingWorker
     event_worker: EventProcessingWorker = EventProcessingWorker
     profile_monitor: ProfileMonitor = ProfileMonitor
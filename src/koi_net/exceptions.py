@@ -16,11 +16,13 @@ Exception hierarchy (conceptually)::
           RemoteInvalidKeyError
           RemoteInvalidSignatureError
           RemoteInvalidTargetError
+          RemoteOverloadedError
     ProtocolError
       UnknownNodeError
       InvalidKeyError
       InvalidSignatureError
       InvalidTargetError
+      OverloadedError
     MissingEnvVarsError
 """
 
@@ -87,6 +89,10 @@ class RemoteInvalidTargetError(RemoteProtocolError):
     """Raised by peer node when this node's envelope target is not it's RID."""
     pass
 
+class RemoteOverloadedError(RemoteProtocolError):
+    """Raised by peer node when it can't accept the request, and should be retried later."""
+    pass
+
 
 class ProtocolError(KoiNetError):
     """Base for protocol errors raised by this node."""
@@ -108,6 +114,10 @@ class InvalidTargetError(ProtocolError):
     """Raised when peer node's target is not this node."""
     pass
 
+class OverloadedError(ProtocolError):
+    """Raised when this node can't accept a request until its queues drain."""
+    pass
+
 class MissingEnvVarsError(KoiNetError):
     """Raised when required environment variables are missing."""
     def __init__(self, message: str, vars: list[str]):
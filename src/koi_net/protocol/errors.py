@@ -6,7 +6,8 @@ from ..exceptions import (
     UnknownNodeError,
     InvalidKeyError,
     InvalidSignatureError,
-    InvalidTargetError
+    InvalidTargetError,
+    OverloadedError
 )
 
 
@@ -15,10 +16,17 @@ class ErrorType(StrEnum):
     InvalidKey = "invalid_key"
     InvalidSignature = "invalid_signature"
     InvalidTarget = "invalid_target"
+    Overloaded = "overloaded"
 
 EXCEPTION_TO_ERROR_TYPE: dict[ProtocolError, ErrorType] = {
     UnknownNodeError: ErrorType.UnknownNode,
     InvalidKeyError: ErrorType.InvalidKey,
     InvalidSignatureError: ErrorType.InvalidSignature,
-    InvalidTargetError: ErrorType.InvalidTarget
+    InvalidTargetError: ErrorType.InvalidTarget,
+    OverloadedError: ErrorType.Overloaded
+}
+
+# error types not listed are returned with status code 400
+ERROR_TYPE_TO_STATUS_CODE: dict[ErrorType, int] = {
+    ErrorType.Overloaded: 503
 }
\ No newline at end of file
@@ -0,0 +1,73 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from queue import Queue
+from types import SimpleNamespace
+
+from rid_lib.types import KoiNetEdge, KoiNetNode
+
+from koi_net.components.kobj_queue import KobjQueue
+from koi_net.components.kobj_worker import KnowledgeProcessingWorker
+from koi_net.components.logging_context import LoggingContext
+from koi_net.config import KobjWorkerConfig, PipelineConfig
+
+
+@dataclass
+class RecordingPipeline:
+    """Records processed RIDs, processing nodes slowly."""
+    
+    processed: list = field(default_factory=list)
+    
+    def process_batch(self, kobjs):
+        for kobj in kobjs:
+            if type(kobj.rid) is KoiNetNode:
+                time.sleep(0.2)
+            self.processed.append(kobj.rid)
+
+
+def test_node_processed_before_its_edge_with_multiple_workers(tmp_path: Path):
+    num_workers = 4
+    config = SimpleNamespace(koi_net=SimpleNamespace(
+        kobj_worker=KobjWorkerConfig(num_workers=num_workers),
+        pipeline=PipelineConfig()
+    ))
+    log = logging.getLogger(__name__)
+    shutdown_signal = threading.Event()
+    
+    node = KoiNetNode("peer", "x")
+    # edge RID hashed to a different shard than the node
+    edge = next(
+        edge for edge in (KoiNetEdge(f"edge{i}") for i in range(100))
+        if hash(edge) % num_workers != hash(node) % num_workers
+    )
+    
+    kobj_queue = KobjQueue(
+        log=log, 
+        shutdown_signal=shutdown_signal, 
+        config=config, 
+        root_dir=tmp_path
+    )
+    pipeline = RecordingPipeline()
+    worker = KnowledgeProcessingWorker(
+        log=log,
+        logging_context=LoggingContext(root_dir=tmp_path),
+        shutdown_signal=shutdown_signal,
+        exception_queue=Queue(),
+        config=config,
+        kobj_queue=kobj_queue,
+        event_queue=SimpleNamespace(is_full=lambda: False),
+        pipeline=pipeline,
+        request_handler=None
+    )
+    
+    worker.start()
+    try:
+        kobj_queue.push(rid=node, source=node)
+        kobj_queue.push(rid=edge, source=node)
+        kobj_queue.wait()
+    finally:
+        worker.stop()
+    
+    assert pipeline.processed == [node, edge]
@@ -0,0 +1,80 @@
+import logging
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+
+from rid_lib.ext import Bundle
+from rid_lib.types import KoiNetEdge, KoiNetNode
+
+from koi_net.components.pipeline import KnowledgePipeline
+from koi_net.components.pipeline_metrics import PipelineMetrics
+from koi_net.config import PipelineConfig
+from koi_net.protocol.api.models import BundlesPayload, ManifestsPayload
+from koi_net.protocol.edge import EdgeType, generate_edge_bundle
+from koi_net.protocol.knowledge_object import KnowledgeObject
+
+
+@dataclass
+class RecordingRequestHandler:
+    """Serves bundles, recording the source and RIDs of each fetch."""
+    
+    bundles: dict
+    fetches: list = field(default_factory=list)
+    
+    def fetch_manifests(self, node, rids):
+        self.fetches.append(("manifests", node, len(rids)))
+        return ManifestsPayload(manifests=[self.bundles[rid].manifest for rid in rids])
+    
+    def fetch_bundles(self, node, rids):
+        self.fetches.append(("bundles", node, len(rids)))
+        return BundlesPayload(bundles=[self.bundles[rid] for rid in rids])
+
+
+def make_pipeline(request_handler=None) -> KnowledgePipeline:
+    config = SimpleNamespace(koi_net=SimpleNamespace(pipeline=PipelineConfig()))
+    return KnowledgePipeline(
+        log=logging.getLogger(__name__),
+        config=config,
+        cache=None,
+        request_handler=request_handler,
+        event_queue=None,
+        graph=None,
+        pipeline_metrics=PipelineMetrics(config)
+    )
+
+
+def test_node_catch_up_fetches_once_per_source():
+    sources = [KoiNetNode("coordinator", "a"), KoiNetNode("coordinator", "b")]
+    nodes = [KoiNetNode(f"node{i}", "x") for i in range(100)]
+    bundles = {node: Bundle.generate(node, {"name": node.name}) for node in nodes}
+    request_handler = RecordingRequestHandler(bundles)
+    pipeline = make_pipeline(request_handler)
+    
+    pipeline.process_batch([
+        KnowledgeObject.from_rid(node, source=sources[i % 2])
+        for i, node in enumerate(nodes)
+    ])
+    
+    assert request_handler.fetches == [
+        (kind, source, 50)
+        for kind in ("manifests", "bundles")
+        for source in sources
+    ]
+
+
+def test_split_batch_before_edge_connecting_earlier_node():
+    peer = KoiNetNode("peer", "x")
+    other = KoiNetNode("other", "x")
+    edge_bundle = generate_edge_bundle(
+        source=peer,
+        target=KoiNetNode("me", "x"),
+        rid_types=[KoiNetNode],
+        edge_type=EdgeType.WEBHOOK
+    )
+    
+    node_kobj = KnowledgeObject.from_rid(peer)
+    other_kobj = KnowledgeObject.from_rid(other)
+    edge_kobj = KnowledgeObject.from_bundle(edge_bundle, source=peer)
+    
+    assert KnowledgePipeline.split_batch([node_kobj, other_kobj, edge_kobj]) == [
+        [node_kobj, other_kobj], [edge_kobj]
+    ]